@@ -61,6 +61,18 @@ else
     fi
 fi
 
+# Install rapidfuzz (optional - faster fuzzy netID matching)
+if pip3 list 2>/dev/null | grep -q rapidfuzz; then
+    echo "  ✓ rapidfuzz already installed"
+else
+    echo "  Installing rapidfuzz (optional)..."
+    if pip3 install rapidfuzz 2>/dev/null || pip3 install --break-system-packages rapidfuzz 2>/dev/null; then
+        echo "  ✓ rapidfuzz installed successfully"
+    else
+        echo -e "  ${YELLOW}⚠ rapidfuzz not installed - using slower difflib matching${NC}"
+    fi
+fi
+
 echo ""
 echo "======================================================================="
 echo "Step 2: Running Validation Tests"
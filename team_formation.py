@@ -23,10 +23,85 @@ LOGGING:
 import sys
 import os
 import argparse
+import codecs
+import csv
+import hashlib
+import heapq
 import pandas as pd
+import numpy as np
 import re
+import tempfile
 import logging
+import functools
+import itertools
+from collections import Counter, defaultdict, deque
 from difflib import SequenceMatcher
+from operator import itemgetter
+
+# Optional: RapidFuzz provides a native (C++) string similarity backend.
+# Fall back to difflib when it isn't installed.
+try:
+    from rapidfuzz import process as rf_process, fuzz as rf_fuzz
+    from rapidfuzz.distance import JaroWinkler as rf_jaro_winkler
+except ImportError:
+    rf_process = None
+    rf_fuzz = None
+    rf_jaro_winkler = None
+
+FUZZY_METRICS = ('ratio', 'jaro_winkler')
+
+# Optional: pyarrow provides a faster, multithreaded CSV parser for pandas
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Optional: Numba JIT-compiles the integer subteam search and merge kernels.
+# Fall back to the set-based / numpy implementations when it isn't installed.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+# Buffer size for the output CSV, so writes reach the OS in a
+# few large syscalls instead of one per default-sized (st_blksize) block
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Section rules for the report, test banner and final summary
+RULE = "=" * 70
+REPORT_RULE = RULE + "\n"
+REPORT_SECTION_RULE = "-" * 70 + "\n"
+
+# Report buckets for average ranking per person, in display order
+REPORT_SCORE_RANGES = (
+    'Perfect (all #1)',
+    'Excellent (avg 1.0-2.0 per person)',
+    'Good (avg 2.0-3.0 per person)',
+    'Fair (avg 3.0-4.0 per person)',
+    'Poor (avg 4.0+ per person)'
+)
+
+
+# Bump when parse_input_csv's output changes, so --cache-dir entries written
+# by older versions are not reused
+PARSE_CACHE_VERSION = 1
+
+# Precompiled patterns for the per-cell parsers
+_PREF_RE = re.compile(r'#(\d+)\s*Choice')
+_BRACKET_RE = re.compile(r'\[([^\]]+)\]')
+_LAST_WORD_RE = re.compile(r'\s(\S+)$')
+
+# Email, comma and parenthesis formats in one pass. Each branch is a
+# lookahead from the start of the string, so branches are tried in priority
+# order (email, then comma, then paren) rather than by leftmost position.
+_MEMBER_RE = re.compile(
+    r'^(?:(?=.*?(?P<email>\w+)@(?:uw\.edu|cs\.washington\.edu))'
+    r'|(?=.*?,\s*(?P<comma>\w+)\s*$)'
+    r'|(?=.*?\((?P<paren>\w+)\)))',
+    re.DOTALL
+)
 
 
 def setup_logging(verbose=False, log_file='team_formation.log'):
@@ -61,13 +136,14 @@ def setup_logging(verbose=False, log_file='team_formation.log'):
     logger.addHandler(console_handler)
     
     # File handler (detailed format)
+    # Same level as the console: DEBUG records are only built and written with --verbose
     file_handler = logging.FileHandler(log_file, mode='w')
-    file_handler.setLevel(logging.DEBUG)  # Always log everything to file
+    file_handler.setLevel(log_level)
     file_handler.setFormatter(detailed_formatter)
     logger.addHandler(file_handler)
     
-    logging.info(f"Logging configured: level={logging.getLevelName(log_level)}, file={log_file}")
-    logging.debug(f"Verbose logging enabled")
+    logging.info("Logging configured: level=%s, file=%s", logging.getLevelName(log_level), log_file)
+    logging.debug("Verbose logging enabled")
 
 
 def run_tests(input_filepath):
@@ -80,9 +156,9 @@ def run_tests(input_filepath):
     Returns:
         bool: True if all tests pass, False otherwise
     """
-    print("=" * 70)
+    print(RULE)
     print("RUNNING TEAM FORMATION PIPELINE TESTS")
-    print("=" * 70)
+    print(RULE)
     
     test_passed = 0
     test_failed = 0
@@ -105,6 +181,9 @@ def run_tests(input_filepath):
         team_cols = [col for col in df.columns if 'Team Member' in col]
         assert len(team_cols) > 0, "No team member columns found"
         
+        # Classify columns once for the remaining tests
+        columns = classify_columns(df)
+        
         print(f"  ✓ CSV parsed successfully")
         print(f"  ✓ Found {len(df)} rows")
         print(f"  ✓ Found {len(project_cols)} project columns")
@@ -146,31 +225,21 @@ def run_tests(input_filepath):
         print("\n[Test 3] Project Preferences...")
         
         # Extract preferences (simplified version)
-        project_columns = []
-        project_names = []
-        for i in range(4, len(df.columns)):
-            col_name = df.columns[i]
-            if 'Team Member' in col_name:
-                break
-            project_name = extract_project_name(col_name)
-            if project_name:
-                project_columns.append(i)
-                project_names.append(project_name)
+        project_columns = columns['project_columns']
+        project_names = columns['project_names']
         
-        # Check each person has preferences
-        for row_idx in range(len(df)):
-            netid = df.iloc[row_idx, 3]
-            prefs = []
-            for col_idx in project_columns:
-                cell_value = df.iloc[row_idx, col_idx]
-                ranking = parse_preference_value(cell_value)
-                if ranking is not None:
-                    prefs.append(ranking)
-            
-            # Most people should have 5 preferences
-            if len(prefs) not in [0, 5]:
-                print(f"  ⚠ {netid} has {len(prefs)} preferences (expected 5)")
+        # Check each person has preferences, counting parsed cells per row
+        # from one vectorized parse per column
+        pref_counts = np.zeros(len(df), dtype=np.int64)
+        for col_idx in project_columns:
+            pref_counts += parse_preference_values(df.iloc[:, col_idx]) >= 0
         
+        # Most people should have 5 preferences
+        unusual_counts = [f"{netids[row_idx]} ({pref_counts[row_idx]})"
+                          for row_idx in np.flatnonzero((pref_counts != 0) & (pref_counts != 5))]
+        
+        if unusual_counts:
+            print(f"  ⚠ {len(unusual_counts)} student(s) without exactly 5 preferences: {', '.join(unusual_counts)}")
         print(f"  ✓ Project preferences extracted")
         print(f"  ✓ Found {len(project_names)} projects")
         test_passed += 1
@@ -184,10 +253,7 @@ def run_tests(input_filepath):
         print("\n[Test 4] Subteam Identification...")
         
         # This is a simplified test - full validation happens in main pipeline
-        team_member_cols = []
-        for i in range(len(df.columns)):
-            if 'Team Member' in df.columns[i]:
-                team_member_cols.append(i)
+        team_member_cols = columns['team_member_columns']
         
         assert len(team_member_cols) > 0, "No team member columns found"
         
@@ -206,19 +272,16 @@ def run_tests(input_filepath):
         print("\n[Test 5] Data Consistency...")
         
         # Check no completely empty rows
-        empty_rows = 0
-        for i in range(len(df)):
-            if df.iloc[i].isna().all():
-                empty_rows += 1
+        empty_rows = int(df.isna().all(axis=1).sum())
         
         assert empty_rows == 0, f"Found {empty_rows} completely empty rows"
         
         # Check netIDs are reasonable (alphanumeric, reasonable length)
-        for netid in netids:
-            if not pd.isna(netid):
-                netid_str = str(netid).strip()
-                assert len(netid_str) > 0, "Empty netID found"
-                assert len(netid_str) < 50, f"Suspiciously long netID: {netid_str}"
+        netid_strs = pd.Series(netids, dtype=object).dropna().astype(str).str.strip()
+        netid_lens = netid_strs.str.len()
+        assert (netid_lens > 0).all(), "Empty netID found"
+        too_long = netid_strs[netid_lens >= 50]
+        assert too_long.empty, f"Suspiciously long netID: {too_long.iloc[0]}"
         
         print(f"  ✓ No empty rows")
         print(f"  ✓ All netIDs are reasonable")
@@ -232,19 +295,19 @@ def run_tests(input_filepath):
         test_failed += 1
     
     # Summary
-    print("\n" + "=" * 70)
+    print("\n" + RULE)
     print("TEST SUMMARY")
-    print("=" * 70)
+    print(RULE)
     print(f"Passed: {test_passed}")
     print(f"Failed: {test_failed}")
     
     if test_failed == 0:
         print("\n✓ ALL TESTS PASSED")
-        print("=" * 70 + "\n")
+        print(RULE + "\n")
         return True
     else:
         print(f"\n✗ {test_failed} TEST(S) FAILED")
-        print("=" * 70 + "\n")
+        print(RULE + "\n")
         return False
 
 
@@ -262,36 +325,51 @@ class DataQualityTracker:
             'no_common_preferences': [],
             'case_normalization': []
         }
+        # Display names for the report and summary, e.g. 'Missing Data'
+        self.category_names = {category: category.replace('_', ' ').title() for category in self.issues}
     
-    def add_issue(self, category, message):
-        """Add an issue to track."""
+    def add_issue(self, category, message, *args):
+        """
+        Add an issue to track.
+        
+        The message is %-formatted with args only when it is displayed, so
+        issues that are just counted are never formatted.
+        """
         if category in self.issues:
-            self.issues[category].append(message)
+            self.issues[category].append((message, args))
+    
+    def format_issues(self, category, limit=None):
+        """Return the formatted messages for a category (the first `limit` if given)."""
+        entries = self.issues[category] if limit is None else self.issues[category][:limit]
+        return [message % args if args else message for message, args in entries]
     
     def has_issues(self):
         """Check if any issues were found."""
-        return any(len(issues) > 0 for issues in self.issues.values())
+        return any(self.issues.values())
     
     def print_summary(self):
         """Print a summary of all issues found."""
         logging.info("\n--- Data Quality Issues Summary ---")
-        total_issues = sum(len(issues) for issues in self.issues.values())
+        total_issues = sum(map(len, self.issues.values()))
         
         if total_issues == 0:
             logging.info("✓ No data quality issues found!")
             return
         
-        logging.warning(f"Found {total_issues} issue(s):\n")
+        # Build the whole summary and emit it as a single record
+        lines = [f"Found {total_issues} issue(s):\n"]
         
         for category, issues in self.issues.items():
             if issues:
-                category_name = category.replace('_', ' ').title()
-                logging.warning(f"{category_name}: {len(issues)}")
-                for issue in issues[:3]:  # Show first 3
-                    logging.warning(f"  - {issue}")
+                category_name = self.category_names[category]
+                lines.append(f"{category_name}: {len(issues)}")
+                for issue in self.format_issues(category, 3):  # Show first 3
+                    lines.append(f"  - {issue}")
                 if len(issues) > 3:
-                    logging.warning(f"  ... and {len(issues) - 3} more")
-                logging.warning("")
+                    lines.append(f"  ... and {len(issues) - 3} more")
+                lines.append("")
+        
+        logging.warning("%s", "\n".join(lines))
 
 
 def validate_input_data(df, netids, project_prefs, quality_tracker):
@@ -306,12 +384,12 @@ def validate_input_data(df, netids, project_prefs, quality_tracker):
     """
     print("\n--- Validating Input Data ---")
     
-    # Check for duplicate netIDs
-    seen_netids = set()
-    for netid in netids:
-        if netid in seen_netids:
-            quality_tracker.add_issue('duplicate_netids', f"Duplicate netID: {netid}")
-        seen_netids.add(netid)
+    netid_series = pd.Series(netids, dtype=object)
+    
+    # Check for duplicate netIDs (single hash pass; blanks are reported as missing below)
+    duplicate_mask = netid_series.duplicated(keep='first') & netid_series.notna()
+    for netid in netid_series[duplicate_mask]:
+        quality_tracker.add_issue('duplicate_netids', "Duplicate netID: %s", netid)
     
     if quality_tracker.issues['duplicate_netids']:
         print(f"⚠ Found {len(quality_tracker.issues['duplicate_netids'])} duplicate netID(s)")
@@ -323,7 +401,7 @@ def validate_input_data(df, netids, project_prefs, quality_tracker):
     for netid, prefs in project_prefs.items():
         if len(prefs) != 5:
             quality_tracker.add_issue('invalid_project_counts', 
-                                     f"{netid}: has {len(prefs)} preferences (expected 5)")
+                                     "%s: has %d preferences (expected 5)", netid, len(prefs))
             invalid_count += 1
     
     if invalid_count > 0:
@@ -332,54 +410,227 @@ def validate_input_data(df, netids, project_prefs, quality_tracker):
         print(f"✓ All students have exactly 5 project preferences")
     
     # Check for missing required data
-    missing_count = 0
-    for i, netid in enumerate(netids):
-        if pd.isna(netid) or str(netid).strip() == '':
-            quality_tracker.add_issue('missing_data', f"Row {i+1}: Missing netID")
-            missing_count += 1
+    missing_mask = netid_series.isna() | (netid_series.astype(str).str.strip() == '')
+    missing_rows = np.flatnonzero(missing_mask.to_numpy())
+    for i in missing_rows:
+        quality_tracker.add_issue('missing_data', "Row %d: Missing netID", i + 1)
+    missing_count = len(missing_rows)
     
     if missing_count > 0:
         print(f"⚠ {missing_count} row(s) have missing netIDs")
     else:
         print(f"✓ All rows have netIDs")
     
-    print(f"\nValidation complete. Found {sum(len(v) for v in quality_tracker.issues.values())} total issue(s).")
+    print(f"\nValidation complete. Found {sum(map(len, quality_tracker.issues.values()))} total issue(s).")
+
+
+def build_netid_candidates(known_netids):
+    """
+    Precompute the lowercased known netIDs that fuzzy_match_netid compares against.
+    
+    Args:
+        known_netids: Collection of known valid netIDs
+        
+    Returns:
+        dict with keys:
+            - 'known': List of known netIDs
+            - 'lowered': Their lowercased, stripped forms (same order)
+            - 'by_lower': Dictionary mapping lowered form -> first known netID
+            - 'by_length': Dictionary mapping length -> list of
+              (index, known, lowered) with lowered forms of that length
+    """
+    known = list(known_netids)
+    lowered = [str(netid).lower().strip() for netid in known]
+    by_lower = {}
+    by_length = defaultdict(list)
+    for i, (netid, netid_lower) in enumerate(zip(known, lowered)):
+        by_lower.setdefault(netid_lower, netid)
+        by_length[len(netid_lower)].append((i, netid, netid_lower))
+    return {
+        'known': known,
+        'lowered': lowered,
+        'by_lower': by_lower,
+        'by_length': dict(by_length)
+    }
 
 
-def fuzzy_match_netid(netid, known_netids, threshold=0.8):
+def fuzzy_match_netid(netid, known_netids, threshold=0.8, metric='ratio', candidates=None):
     """
     Try to fuzzy match a netID against known netIDs.
     
+    Uses RapidFuzz when available, otherwise difflib's SequenceMatcher.
+    
     Args:
         netid: The netID to match
         known_netids: Set of known valid netIDs
         threshold: Similarity threshold (0-1)
+        metric: 'ratio' (edit-based similarity, default) or 'jaro_winkler'
+                (prefix-weighted; requires rapidfuzz)
+        candidates: Optional result of build_netid_candidates(known_netids),
+                    so repeated calls against the same set don't rebuild it
         
     Returns:
         tuple: (matched_netid, similarity_score) or (None, 0) if no match
+        
+    Raises:
+        ValueError: If the metric is unknown or needs rapidfuzz and it isn't installed
     """
+    if metric not in FUZZY_METRICS:
+        raise ValueError(f"Unknown fuzzy matching metric: {metric}")
+    if metric == 'jaro_winkler' and rf_jaro_winkler is None:
+        raise ValueError("Jaro-Winkler matching requires rapidfuzz (pip install rapidfuzz)")
+    
+    if candidates is None:
+        candidates = build_netid_candidates(known_netids)
+    
     netid_lower = str(netid).lower().strip()
     
+    # Exact (case-insensitive) hit - no similarity scoring needed
+    if netid_lower in candidates['by_lower']:
+        return (candidates['by_lower'][netid_lower], 1.0)
+    
+    if metric == 'jaro_winkler':
+        match = rf_process.extractOne(
+            netid_lower,
+            candidates['lowered'],
+            scorer=rf_jaro_winkler.normalized_similarity,
+            score_cutoff=threshold
+        )
+        if match is None:
+            return (None, 0)
+        return (candidates['known'][match[2]], match[1])
+    
+    if rf_process is not None:
+        # Single native call scores every candidate and applies the cutoff
+        match = rf_process.extractOne(
+            netid_lower,
+            candidates['lowered'],
+            scorer=rf_fuzz.ratio,
+            score_cutoff=threshold * 100
+        )
+        if match is None:
+            return (None, 0)
+        return (candidates['known'][match[2]], match[1] / 100)
+    
     best_match = None
+    best_index = None
     best_score = 0
-    
-    for known in known_netids:
-        known_lower = str(known).lower().strip()
-        similarity = SequenceMatcher(None, netid_lower, known_lower).ratio()
+    netid_len = len(netid_lower)
+    
+    # Closest lengths first, so a good match is found early and prunes more
+    for length in sorted(candidates['by_length'], key=lambda length: abs(length - netid_len)):
+        # Ratio can't exceed 2*min_len / total_len, so the length alone can
+        # rule out a whole bucket
+        total_len = netid_len + length
+        if total_len == 0 or 2 * min(netid_len, length) / total_len < max(threshold, best_score):
+            continue
         
-        if similarity > best_score and similarity >= threshold:
-            best_score = similarity
-            best_match = known
+        for i, known, known_lower in candidates['by_length'][length]:
+            matcher = SequenceMatcher(None, netid_lower, known_lower)
+            if matcher.quick_ratio() < max(threshold, best_score):
+                continue
+            similarity = matcher.ratio()
+            
+            # Ties go to the earliest candidate, as in a single ordered scan
+            if similarity >= threshold and (similarity > best_score or (
+                    similarity == best_score and best_index is not None and i < best_index)):
+                best_score = similarity
+                best_index = i
+                best_match = known
     
     return (best_match, best_score)
 
 
-def parse_input_csv(filepath):
+def has_undecoded_bytes(df):
+    """
+    Check whether any text column was left as raw bytes.
+    
+    The pyarrow engine doesn't raise on invalid UTF-8; it keeps the whole
+    column as bytes instead (for categoricals, the categories), so checking
+    one value per column is enough.
+    """
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = dtype.categories
+        elif dtype == object:
+            values = df[col].dropna().array
+        else:
+            continue
+        if len(values) > 0 and isinstance(values[0], bytes):
+            return True
+    return False
+
+
+def sniff_encoding(filepath, sample_size=65536):
+    """
+    Guess the input file's encoding from its first bytes.
+    
+    A UTF-8 byte order mark means utf-8-sig; otherwise the sample is decoded
+    as UTF-8 (a character cut off at the end of the sample is allowed) and
+    anything that fails is treated as latin-1, which decodes any byte.
+    
+    Args:
+        filepath (str): Path to the CSV file
+        sample_size (int): Number of bytes to inspect
+        
+    Returns:
+        str: 'utf-8-sig', 'utf-8' or 'latin-1'
+    """
+    with open(filepath, 'rb') as f:
+        head = f.read(sample_size)
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return 'latin-1'
+    return 'utf-8'
+
+
+def input_column_spec(filepath, encoding):
+    """
+    Work out which CSV columns to load and how, from the header row alone.
+    
+    Only columns A-D (timestamp, email, name, netID), the project block and
+    the team member block are used downstream. Project cells hold one of a
+    handful of "#N Choice" values, so they are read as categoricals (small
+    integer codes) instead of one string object per cell.
+    
+    Args:
+        filepath (str): Path to the CSV file
+        encoding (str): Encoding to read the header with
+        
+    Returns:
+        tuple: (usecols, dtype) for pd.read_csv; usecols is None when every
+               column is needed, and both are None when header names are
+               blank or repeated (pandas would rename those columns)
+    """
+    header = pd.read_csv(filepath, encoding=encoding, header=None, nrows=1, dtype=str).iloc[0]
+    if header.isna().any() or header.duplicated().any():
+        return None, None
+    
+    names = header.tolist()
+    columns = classify_columns(pd.DataFrame(columns=names))
+    keep = set(range(min(4, len(names))))
+    keep.update(columns['project_columns'], columns['team_member_columns'])
+    
+    usecols = [name for i, name in enumerate(names) if i in keep] if len(keep) < len(names) else None
+    dtype = {names[i]: 'category' for i in columns['project_columns']}
+    return usecols, dtype
+
+
+def parse_input_csv(filepath, cache_dir=None):
     """
     Parse the input CSV file containing student preferences.
     
+    With cache_dir, the parsed DataFrame is pickled there under a hash of the
+    file's contents (and PARSE_CACHE_VERSION and CSV_ENGINE), so re-running on
+    an unchanged file skips parsing. An unreadable cache entry is treated as a
+    miss and rewritten.
+    
     Args:
         filepath (str): Path to the CSV file
+        cache_dir (str): Optional directory for cached parse results
         
     Returns:
         pd.DataFrame: Parsed DataFrame with student data
@@ -391,22 +642,74 @@ def parse_input_csv(filepath):
     try:
         print(f"\n--- Parsing CSV file ---")
         
-        # Try UTF-8 encoding first
-        try:
-            df = pd.read_csv(filepath, encoding='utf-8')
-        except UnicodeDecodeError:
-            print("UTF-8 encoding failed, trying latin-1...")
-            df = pd.read_csv(filepath, encoding='latin-1')
-        
-        # Print basic information
-        print(f"Successfully loaded CSV file!")
-        print(f"Number of rows: {len(df)}")
-        print(f"Number of columns: {len(df.columns)}")
-        print(f"\nColumn names (first 10):")
-        for i, col in enumerate(df.columns[:10]):
-            print(f"  Column {i}: {col}")
+        df = None
+        cache_path = None
+        if cache_dir is not None:
+            # The parser engine decides the cached frame's dtypes, so it is
+            # part of the key along with the cache version
+            hasher = hashlib.sha1(f"v{PARSE_CACHE_VERSION}:{CSV_ENGINE}:".encode())
+            with open(filepath, 'rb') as f:
+                hasher.update(f.read())
+            cache_path = os.path.join(cache_dir, f"{hasher.hexdigest()[:16]}.pkl")
+            if os.path.exists(cache_path):
+                try:
+                    df = pd.read_pickle(cache_path)
+                except MemoryError:
+                    raise
+                except Exception as e:
+                    # A truncated or unreadable entry is a miss; it is
+                    # re-parsed and overwritten below
+                    logging.warning("Ignoring unreadable parse cache %s: %s", cache_path, e)
+                else:
+                    print(f"Loaded cached parse: {cache_path}")
+        
+        if df is None:
+            def _read(encoding):
+                usecols, dtype = input_column_spec(filepath, encoding)
+                return pd.read_csv(filepath, encoding=encoding, engine=CSV_ENGINE, usecols=usecols, dtype=dtype)
+            
+            # Pick the encoding up front so a latin-1 file is parsed once
+            # (with the pyarrow parser when installed), loading only the
+            # columns the pipeline uses. Invalid UTF-8 past the sniffed
+            # sample (a decode error, or bytes pyarrow left undecoded)
+            # still falls back to latin-1
+            encoding = sniff_encoding(filepath)
+            if encoding != 'latin-1':
+                try:
+                    df = _read(encoding)
+                except UnicodeDecodeError:
+                    encoding = 'latin-1'
+                else:
+                    if CSV_ENGINE == 'pyarrow' and has_undecoded_bytes(df):
+                        encoding = 'latin-1'
+            if encoding == 'latin-1':
+                print("UTF-8 encoding failed, trying latin-1...")
+                df = _read('latin-1')
+            
+            if cache_path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                # Write to a temporary file and rename it into place, so an
+                # interrupted run never leaves a partial entry under cache_path
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+                os.close(fd)
+                try:
+                    df.to_pickle(tmp_path)
+                    os.replace(tmp_path, cache_path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+        
+        # Print basic information (as one write)
+        lines = [
+            "Successfully loaded CSV file!",
+            f"Number of rows: {len(df)}",
+            f"Number of columns: {len(df.columns)}",
+            "\nColumn names (first 10):",
+        ]
+        lines.extend(f"  Column {i}: {col}" for i, col in enumerate(df.columns[:10]))
         if len(df.columns) > 10:
-            print(f"  ... and {len(df.columns) - 10} more columns")
+            lines.append(f"  ... and {len(df.columns) - 10} more columns")
+        print("\n".join(lines))
         
         return df
         
@@ -414,6 +717,9 @@ def parse_input_csv(filepath):
         raise FileNotFoundError(f"CSV file not found: {filepath}")
     except pd.errors.EmptyDataError:
         raise Exception(f"CSV file is empty: {filepath}")
+    except MemoryError:
+        # Not a parse error; re-wrapping it would hide that the input is too big
+        raise
     except Exception as e:
         raise Exception(f"Error reading CSV file: {e}")
 
@@ -439,9 +745,8 @@ def extract_basic_data(df):
     netids = df.iloc[:, 3].tolist()
     
     print(f"Number of NetIDs extracted: {len(netids)}")
-    print(f"\nFirst 5 NetIDs:")
-    for i, netid in enumerate(netids[:5]):
-        print(f"  {i+1}. {netid}")
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("First 5 NetIDs:\n%s", "\n".join(f"  {i+1}. {netid}" for i, netid in enumerate(netids[:5])))
     
     # Return extracted data
     return {
@@ -464,13 +769,37 @@ def parse_preference_value(cell_value):
     
     # Convert to string and extract number from patterns like "#1 Choice", "#2 Choice", etc.
     value_str = str(cell_value).strip()
-    match = re.search(r'#(\d+)\s*Choice', value_str)
+    match = _PREF_RE.search(value_str)
     if match:
         return int(match.group(1))
     
     return None
 
 
+def parse_preference_values(values):
+    """
+    Vectorized version of parse_preference_value for a whole column.
+    
+    Categorical columns (see input_column_spec) only have a few distinct
+    values, so each category is parsed once and the integer codes are mapped
+    through the result; other columns go through one str.extract pass.
+    
+    Args:
+        values (pd.Series): Preference cell values
+        
+    Returns:
+        np.ndarray: int64 rankings, -1 where blank/invalid
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        rank_of_code = [parse_preference_value(category) for category in values.cat.categories]
+        # Missing cells have code -1, which picks the trailing -1
+        lookup = np.array([-1 if ranking is None else ranking for ranking in rank_of_code] + [-1], dtype=np.int64)
+        return lookup[values.cat.codes.to_numpy()]
+    
+    ranks = pd.to_numeric(values.astype(str).str.extract(_PREF_RE, expand=False))
+    return ranks.fillna(-1).to_numpy(dtype=np.int64)
+
+
 def extract_project_name(column_header):
     """
     Extract the project name from a column header.
@@ -482,18 +811,63 @@ def extract_project_name(column_header):
         str: The project name, or None if no project name found
     """
     # Extract text within brackets [ProjectName]
-    match = re.search(r'\[([^\]]+)\]', column_header)
+    match = _BRACKET_RE.search(column_header)
     if match:
         return match.group(1).strip()
     return None
 
 
-def extract_project_preferences(df):
+def classify_columns(df):
+    """
+    Classify the DataFrame columns into project and team member columns.
+    
+    Project columns start at column E (index 4), contain "[ProjectName]" in
+    the header and end at the first "Team Member" column.
+    
+    Args:
+        df (pd.DataFrame): The parsed DataFrame
+        
+    Returns:
+        dict with keys:
+            - 'project_columns': List of project column indices
+            - 'project_names': List of project names (same order)
+            - 'team_member_columns': List of team member column indices
+    """
+    project_columns = []
+    project_names = []
+    team_member_columns = []
+    
+    # Single pass over the headers; the project block ends at the first
+    # team member column
+    in_projects = True
+    for i, col_name in enumerate(df.columns):
+        if 'Team Member' in col_name:
+            team_member_columns.append(i)
+            if i >= 4:
+                in_projects = False
+        elif in_projects and i >= 4:
+            # Extract project name from column header
+            project_name = extract_project_name(col_name)
+            if project_name:
+                project_columns.append(i)
+                project_names.append(project_name)
+    
+    return {
+        'project_columns': project_columns,
+        'project_names': project_names,
+        'team_member_columns': team_member_columns
+    }
+
+
+def extract_project_preferences(df, columns=None, netids=None):
     """
     Extract project preferences from the DataFrame.
     
     Args:
         df (pd.DataFrame): The parsed DataFrame
+        columns (dict): Result of classify_columns(df); computed if not given
+        netids (list): NetIDs from column D (extract_basic_data); read from
+            df if not given
         
     Returns:
         dict: Dictionary mapping netID -> {project_name: ranking}
@@ -502,113 +876,92 @@ def extract_project_preferences(df):
     print(f"\n--- Extracting project preferences ---")
     
     # Get netIDs from column D (index 3)
-    netids = df.iloc[:, 3].tolist()
-    
-    # Identify project columns (from column E onwards, index 4+)
-    # Project columns contain brackets "[ProjectName]"
-    # Stop when we reach "Team Member" columns
-    project_columns = []
-    project_names = []
+    if netids is None:
+        netids = df.iloc[:, 3].tolist()
     
-    for i in range(4, len(df.columns)):
-        col_name = df.columns[i]
-        # Stop if we reach team member columns
-        if 'Team Member' in col_name:
-            break
-        
-        # Extract project name from column header
-        project_name = extract_project_name(col_name)
-        if project_name:
-            project_columns.append(i)
-            project_names.append(project_name)
+    if columns is None:
+        columns = classify_columns(df)
+    project_columns = columns['project_columns']
+    project_names = columns['project_names']
     
     print(f"Found {len(project_columns)} project columns")
     print(f"First 5 projects: {project_names[:5]}")
     
-    # Build preferences dictionary
+    # Parse all preference cells one vectorized column at a time into an
+    # integer matrix; blanks/invalid cells become -1
+    ranks = np.empty((len(netids), len(project_columns)), dtype=np.int64)
+    for j, col_idx in enumerate(project_columns):
+        ranks[:, j] = parse_preference_values(df.iloc[:, col_idx])
+    
+    # Build preferences dictionary from plain int rows (no per-cell NaN checks)
     preferences = {}
     
-    for row_idx, netid in enumerate(netids):
-        student_prefs = {}
-        
-        for col_idx, project_name in zip(project_columns, project_names):
-            cell_value = df.iloc[row_idx, col_idx]
-            ranking = parse_preference_value(cell_value)
-            
-            if ranking is not None:
-                student_prefs[project_name] = ranking
-        
-        preferences[netid] = student_prefs
+    for netid, row in zip(netids, ranks.tolist()):
+        preferences[netid] = {
+            project_name: ranking
+            for project_name, ranking in zip(project_names, row)
+            if ranking >= 0
+        }
     
     # Print some statistics
-    total_prefs = sum(len(prefs) for prefs in preferences.values())
+    total_prefs = sum(map(len, preferences.values()))
     avg_prefs = total_prefs / len(preferences) if preferences else 0
     
-    print(f"Total preferences collected: {total_prefs}")
-    print(f"Average preferences per student: {avg_prefs:.1f}")
+    print(f"Total preferences collected: {total_prefs}\n"
+          f"Average preferences per student: {avg_prefs:.1f}")
     
     return preferences
 
 
-def parse_member_string(cell_value):
+def parse_member_strings(values):
     """
-    Parse a team member cell value and extract the netID.
+    Parse a column of team member cell values and extract the netIDs.
     
-    Handles various formats:
+    Handles various formats, in this priority order:
+    - "netid@uw.edu" or "netid@cs.washington.edu"
     - "Name, netid"
-    - "Name netid"
     - "Name (netid)"
-    - "netid@uw.edu" or "netid@cs.washington.edu"
+    - "Name netid" (the last word, if it is lowercase and short)
+    
+    The first three are extracted with one str.extract pass and coalesced;
+    the trailing word fallback only runs on cells they left unparsed.
     
     Args:
-        cell_value: Cell value from CSV
+        values (pd.Series): Team member cell values
         
     Returns:
-        str: The extracted netID, or None if blank/unparseable
+        pd.Series: Extracted netIDs, NaN where blank/unparseable
     """
-    if pd.isna(cell_value) or cell_value == '':
-        return None
+    text = values.map(str, na_action='ignore').astype('string').str.strip()
     
-    value_str = str(cell_value).strip()
-    if not value_str:
-        return None
+    # Single extract pass; coalesce the email/comma/paren groups in priority order
+    groups = text.str.extract(_MEMBER_RE)
+    parsed = groups['email'].fillna(groups['comma']).fillna(groups['paren'])
     
-    # Handle email format: netid@uw.edu or netid@cs.washington.edu
-    email_match = re.search(r'(\w+)@(?:uw\.edu|cs\.washington\.edu)', value_str)
-    if email_match:
-        return email_match.group(1)
-    
-    # Try to find pattern "Name, netid" or "Name netid" or "Name (netid)"
-    # Look for a comma followed by a word (netid)
-    comma_match = re.search(r',\s*(\w+)\s*$', value_str)
-    if comma_match:
-        return comma_match.group(1)
-    
-    # Try parentheses format: "Name (netid)"
-    paren_match = re.search(r'\((\w+)\)', value_str)
-    if paren_match:
-        return paren_match.group(1)
-    
-    # Try space-separated: "Name netid" (take the last word if it looks like a netid)
-    parts = value_str.split()
-    if len(parts) >= 2:
-        # Assume the last part is the netid if it's lowercase and short
-        last_part = parts[-1].strip()
-        if last_part.islower() and len(last_part) <= 20:
-            return last_part
-    
-    # If nothing worked, return None and we'll log a warning
-    return None
+    # "Name netid": last word, only if it's lowercase and short. Only cells
+    # the first pass left unparsed need this second regex pass
+    pending = parsed.isna() & text.notna()
+    if pending.any():
+        last_word = text[pending].str.extract(_LAST_WORD_RE, expand=False)
+        looks_like_netid = (last_word.str.islower() & (last_word.str.len() <= 20)).fillna(False).astype(bool)
+        parsed = parsed.fillna(last_word.where(looks_like_netid))
+    
+    return parsed
 
 
-def extract_subteam_data(df, known_netids=None, quality_tracker=None):
+def extract_subteam_data(df, known_netids=None, quality_tracker=None, columns=None, fuzzy_metric='ratio',
+                         netids=None):
     """
     Extract subteam member preferences from the DataFrame with data cleaning.
     
     Args:
         df (pd.DataFrame): The parsed DataFrame
-        known_netids (set): Set of valid netIDs from the dataset
+        known_netids (frozenset): Set of valid netIDs from the dataset
         quality_tracker (DataQualityTracker): Tracker for data quality issues
+        columns (dict): Result of classify_columns(df); computed if not given
+        fuzzy_metric (str): Similarity metric for fuzzy_match_netid
+        netids (list): NetIDs from column D (extract_basic_data); read from
+            df if not given
         
     Returns:
         dict: Dictionary mapping netID -> list of netIDs they want to work with
@@ -616,131 +969,119 @@ def extract_subteam_data(df, known_netids=None, quality_tracker=None):
     """
     print(f"\n--- Extracting subteam data ---")
     
+    # Get netIDs from column D (index 3)
+    if netids is None:
+        netids = df.iloc[:, 3].tolist()
+    
     if known_netids is None:
-        known_netids = set(df.iloc[:, 3].tolist())
+        known_netids = frozenset(netids)
     if quality_tracker is None:
         quality_tracker = DataQualityTracker()
     
-    # Get netIDs from column D (index 3)
-    netids = df.iloc[:, 3].tolist()
+    # Memoize fuzzy lookups - known_netids is fixed for this call and the
+    # same misspelled netID often shows up in several rows
+    netid_candidates = build_netid_candidates(known_netids)
+    
+    @functools.lru_cache(maxsize=4096)
+    def cached_fuzzy_match(token):
+        return fuzzy_match_netid(token, known_netids, metric=fuzzy_metric, candidates=netid_candidates)
     
     # Find Team Member columns (they start after the project columns)
-    team_member_columns = []
-    for i in range(len(df.columns)):
-        col_name = df.columns[i]
-        if 'Team Member' in col_name:
-            team_member_columns.append(i)
+    if columns is None:
+        columns = classify_columns(df)
+    team_member_columns = columns['team_member_columns']
     
     print(f"Found {len(team_member_columns)} team member columns")
     
+    # Read cells from a plain ndarray rather than per-cell df.iloc lookups,
+    # parsing every team member column in one vectorized pass
+    # (as nested lists, so the row loop doesn't index ndarray rows)
+    team_member_block = df.iloc[:, team_member_columns]
+    parsed_members = team_member_block.apply(parse_member_strings)
+    # Unparsed/blank cells come back as None so the row loop needs no NA checks
+    parsed_member_rows = parsed_members.to_numpy(dtype=object, na_value=None).tolist()
+    # Likewise, keep only the non-blank cells that didn't parse (one
+    # vectorized mask instead of a pd.isna/strip call per cell)
+    nonblank = team_member_block.apply(lambda col: col.notna() & col.astype(str).str.strip().ne(''))
+    unparsed_rows = team_member_block.where(parsed_members.isna() & nonblank).to_numpy(
+        dtype=object, na_value=None).tolist()
+    
     # Build subteam dictionary with data cleaning
     subteams = {}
     unparseable_entries = []
     
-    for row_idx, netid in enumerate(netids):
-        team_members = []
+    # Normalize each student's own netID once, not per team-member cell
+    netids_lower = [str(netid).lower().strip() for netid in netids]
+    
+    for netid, netid_lower, unparsed_values, member_netids in zip(netids, netids_lower, unparsed_rows,
+                                                                  parsed_member_rows):
+        # Insertion-ordered dict keeps the first mention and drops repeats
+        team_members = {}
         
-        for col_idx in team_member_columns:
-            cell_value = df.iloc[row_idx, col_idx]
-            member_netid = parse_member_string(cell_value)
-            
+        for unparsed_value, member_netid in zip(unparsed_values, member_netids):
             if member_netid is not None:
                 # Normalize to lowercase for consistency
-                member_netid_lower = str(member_netid).lower().strip()
-                netid_lower = str(netid).lower().strip()
+                # (parsed tokens are already stripped strings)
+                member_netid_lower = member_netid.lower()
                 
                 # Check if netID needs case normalization
                 if member_netid != member_netid_lower:
                     quality_tracker.add_issue('case_normalization', 
-                                             f"{netid}: team member '{member_netid}' normalized to '{member_netid_lower}'")
+                                             "%s: team member '%s' normalized to '%s'", netid, member_netid, member_netid_lower)
                     member_netid = member_netid_lower
                 
                 # Check if netID is in known set
                 if member_netid not in known_netids:
                     # Try fuzzy matching
-                    matched, score = fuzzy_match_netid(member_netid, known_netids)
+                    matched, score = cached_fuzzy_match(member_netid)
                     if matched:
                         quality_tracker.add_issue('fuzzy_matched_netids', 
-                                                 f"{netid}: '{member_netid}' fuzzy matched to '{matched}' (score: {score:.2f})")
+                                                 "%s: '%s' fuzzy matched to '%s' (score: %.2f)", netid, member_netid, matched, score)
                         member_netid = matched
                     else:
                         quality_tracker.add_issue('unknown_netids_in_subteams', 
-                                                 f"{netid}: team member '{member_netid}' not found in student list")
+                                                 "%s: team member '%s' not found in student list", netid, member_netid)
                         # Still include it - might be a valid netID not in this dataset
                 
-                # Avoid duplicates and self-references
-                if member_netid not in team_members and member_netid != netid_lower:
-                    team_members.append(member_netid)
-                elif member_netid == netid_lower:
-                    # Person listed themselves, just skip
-                    pass
-            elif not pd.isna(cell_value) and str(cell_value).strip():
+                # Skip self-references (person listed themselves)
+                if member_netid != netid_lower:
+                    team_members[member_netid] = None
+            elif unparsed_value is not None:
                 # Log unparseable non-empty entries
-                unparseable_entries.append((netid, str(cell_value)))
+                unparseable_entries.append((netid, str(unparsed_value)))
         
-        subteams[netid] = team_members
+        subteams[netid] = list(team_members)
     
     # Print warnings for unparseable entries
     if unparseable_entries:
-        print(f"\nWarning: {len(unparseable_entries)} unparseable team member entries:")
-        for netid, value in unparseable_entries[:5]:  # Show first 5
-            print(f"  {netid}: '{value}'")
+        lines = [f"\nWarning: {len(unparseable_entries)} unparseable team member entries:"]
+        lines.extend(f"  {netid}: '{value}'" for netid, value in unparseable_entries[:5])  # Show first 5
         if len(unparseable_entries) > 5:
-            print(f"  ... and {len(unparseable_entries) - 5} more")
+            lines.append(f"  ... and {len(unparseable_entries) - 5} more")
+        logging.warning("\n".join(lines))
     
     # Calculate statistics
-    num_with_members = sum(1 for members in subteams.values() if members)
-    total_members = sum(len(members) for members in subteams.values())
+    num_with_members = sum(map(bool, subteams.values()))
+    total_members = sum(map(len, subteams.values()))
     avg_members = total_members / len(subteams) if subteams else 0
     
-    print(f"\nSubteam statistics:")
-    print(f"  Students with subteam preferences: {num_with_members}/{len(subteams)}")
-    print(f"  Total subteam member entries: {total_members}")
-    print(f"  Average members per student: {avg_members:.1f}")
+    print(f"\nSubteam statistics:\n"
+          f"  Students with subteam preferences: {num_with_members}/{len(subteams)}\n"
+          f"  Total subteam member entries: {total_members}\n"
+          f"  Average members per student: {avg_members:.1f}")
     
     # Size distribution
-    size_distribution = {}
-    for members in subteams.values():
-        size = len(members)
-        size_distribution[size] = size_distribution.get(size, 0) + 1
+    sizes = np.fromiter(map(len, subteams.values()), dtype=np.int64, count=len(subteams))
+    size_distribution = np.bincount(sizes)
     
-    print(f"\n  Size distribution:")
-    for size in sorted(size_distribution.keys()):
-        count = size_distribution[size]
-        print(f"    {size} members: {count} students")
+    lines = ["\n  Size distribution:"]
+    for size in np.flatnonzero(size_distribution).tolist():
+        lines.append(f"    {size} members: {size_distribution[size]} students")
+    logging.info("\n".join(lines))
     
     return subteams
 
 
-def validate_subteam(members, subteam_prefs):
-    """
-    Check if a group of netIDs forms a valid subteam.
-    
-    A valid subteam requires that for each member M in the team:
-    - M's preference list contains exactly all other members (not including M themselves)
-    
-    Args:
-        members: Set of netIDs
-        subteam_prefs: Dictionary mapping netID -> list of preferred team members
-        
-    Returns:
-        bool: True if this is a valid subteam
-    """
-    members_set = set(members)
-    
-    for member in members_set:
-        # Get this member's preferences
-        member_prefs = set(subteam_prefs.get(member, []))
-        
-        # Their preferences should be exactly the other members (excluding themselves)
-        expected_prefs = members_set - {member}
-        
-        if member_prefs != expected_prefs:
-            return False
-    
-    return True
-
-
 def identify_subteams(subteam_prefs):
     """
     Identify valid, complete subteams from preference data.
@@ -760,47 +1101,52 @@ def identify_subteams(subteam_prefs):
     complete_subteams = []
     assigned = set()  # Track who's been assigned to a subteam
     
-    # Sort by size of preference list (larger teams first) to prioritize larger subteams
-    sorted_people = sorted(subteam_prefs.items(), key=lambda x: len(x[1]), reverse=True)
-    
-    for netid, prefs in sorted_people:
+    # Only build per-subteam debug messages when they will be emitted
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+    
+    # A valid subteam S is one where every member's preferences are exactly
+    # S minus themselves, i.e. every member of S has the "signature"
+    # {self} | prefs == S. Group people by signature in one pass; a group is a
+    # valid subteam iff it has as many people as its signature has members
+    # (so no per-candidate validation is needed, and valid subteams can't
+    # overlap). Someone who lists themselves can't be in a valid subteam
+    signatures = {netid: frozenset((netid, *prefs))
+                  for netid, prefs in subteam_prefs.items() if prefs and netid not in prefs}
+    signature_counts = Counter(signatures.values())
+    members_of_valid = [netid for netid, signature in signatures.items()
+                        if signature_counts[signature] == len(signature)]
+    
+    # Sort by size of preference list (larger teams first) to prioritize
+    # larger subteams; this only sets the order subteams are listed in
+    members_of_valid.sort(key=lambda netid: len(subteam_prefs[netid]), reverse=True)
+    
+    for netid in members_of_valid:
         if netid in assigned:
             continue
         
-        if not prefs:
-            # No preferences, will be an individual
-            continue
-        
-        # Form potential subteam: this person + their preferences
-        potential_team = {netid} | set(prefs)
-        
-        # Check if this is a valid subteam
-        if validate_subteam(potential_team, subteam_prefs):
-            # Check if any member is already assigned
-            if not (potential_team & assigned):
-                complete_subteams.append(potential_team)
-                assigned.update(potential_team)
-                print(f"  Found subteam of size {len(potential_team)}: {sorted(potential_team)}")
+        potential_team = set(signatures[netid])
+        complete_subteams.append(potential_team)
+        assigned.update(potential_team)
+        if debug_enabled:
+            logging.debug("  Found subteam of size %d: %s", len(potential_team), sorted(potential_team))
     
     # Everyone else is an individual
     all_people = set(subteam_prefs.keys())
     individuals = all_people - assigned
     
-    print(f"\nSubteam identification results:")
-    print(f"  Complete subteams: {len(complete_subteams)}")
-    print(f"  Individuals: {len(individuals)}")
+    print(f"\nSubteam identification results:\n"
+          f"  Complete subteams: {len(complete_subteams)}\n"
+          f"  Individuals: {len(individuals)}")
     
     # Size distribution of subteams
     if complete_subteams:
-        size_dist = {}
-        for team in complete_subteams:
-            size = len(team)
-            size_dist[size] = size_dist.get(size, 0) + 1
+        size_dist = np.bincount(np.fromiter(map(len, complete_subteams), dtype=np.int64,
+                                            count=len(complete_subteams)))
         
-        print(f"\n  Subteam size distribution:")
-        for size in sorted(size_dist.keys()):
-            count = size_dist[size]
-            print(f"    Size {size}: {count} subteam(s)")
+        lines = ["\n  Subteam size distribution:"]
+        for size in np.flatnonzero(size_dist).tolist():
+            lines.append(f"    Size {size}: {size_dist[size]} subteam(s)")
+        logging.info("\n".join(lines))
     
     return {
         'complete_subteams': complete_subteams,
@@ -808,7 +1154,94 @@ def identify_subteams(subteam_prefs):
     }
 
 
-def calculate_team_project_prefs(team_members, project_prefs):
+def build_rank_matrix(project_prefs):
+    """
+    Convert project preferences into a dense rank matrix.
+    
+    Args:
+        project_prefs: Dictionary mapping netID -> {project_name: ranking}
+        
+    Returns:
+        dict with keys:
+            - 'ranks': int8 array (students x projects), 0 = not ranked;
+              a wider signed integer type if some ranking exceeds 127
+            - 'row_of': Dictionary mapping netID -> row index
+            - 'projects': List of project names, one per column
+    """
+    projects = sorted({project for prefs in project_prefs.values() for project in prefs})
+    col_of = {project: i for i, project in enumerate(projects)}
+    row_of = {netid: i for i, netid in enumerate(project_prefs)}
+    
+    # Flatten every (student, project, ranking) entry into typed arrays and
+    # scatter them with one fancy assignment instead of per-cell setitems
+    num_entries = sum(map(len, project_prefs.values()))
+    rows = np.repeat(np.arange(len(row_of), dtype=np.intp),
+                     np.fromiter(map(len, project_prefs.values()), dtype=np.intp, count=len(project_prefs)))
+    cols = np.fromiter((col_of[project] for prefs in project_prefs.values() for project in prefs),
+                       dtype=np.intp, count=num_entries)
+    values = np.fromiter((ranking for prefs in project_prefs.values() for ranking in prefs.values()),
+                         dtype=np.int64, count=num_entries)
+    
+    # Survey rankings (#1-#5) fit in int8; only widen when a ranking doesn't
+    dtype = np.int8
+    if num_entries:
+        dtype = np.result_type(dtype, np.min_scalar_type(int(values.max())))
+    ranks = np.zeros((len(row_of), len(projects)), dtype=dtype)
+    ranks[rows, cols] = values
+    
+    return {
+        'ranks': ranks,
+        'row_of': row_of,
+        'projects': projects
+    }
+
+
+def build_project_masks(project_prefs):
+    """
+    Encode each student's top 5 projects as an integer bitmask.
+    
+    Projects are numbered in sorted order, so two students share a project
+    exactly when the AND of their masks is non-zero.
+    
+    Args:
+        project_prefs: Dictionary mapping netID -> {project_name: ranking}
+        
+    Returns:
+        dict: Dictionary mapping netID -> int bitmask of ranked projects
+    """
+    projects = sorted({project for prefs in project_prefs.values() for project in prefs})
+    bit_of = {project: 1 << i for i, project in enumerate(projects)}
+    
+    project_masks = {}
+    for netid, prefs in project_prefs.items():
+        mask = 0
+        for project in prefs:
+            mask |= bit_of[project]
+        project_masks[netid] = mask
+    return project_masks
+
+
+def members_mask(members, project_masks):
+    """
+    AND together the project bitmasks of a group of students.
+    
+    Args:
+        members: Iterable of netIDs
+        project_masks: Dictionary mapping netID -> int bitmask
+        
+    Returns:
+        int: Bitmask of projects in every member's top 5 (0 if none)
+    """
+    mask = None
+    for netid in members:
+        member_mask = project_masks.get(netid, 0)
+        mask = member_mask if mask is None else mask & member_mask
+        if not mask:
+            return 0
+    return mask or 0
+
+
+def calculate_team_project_prefs(team_members, project_prefs, rank_matrix=None, top_k=None):
     """
     Calculate common project preferences for a team.
     
@@ -818,9 +1251,13 @@ def calculate_team_project_prefs(team_members, project_prefs):
     Args:
         team_members: Iterable of netIDs (set, list, etc.)
         project_prefs: Dictionary mapping netID -> {project_name: ranking}
+        rank_matrix: Optional result of build_rank_matrix(project_prefs);
+                     when given, the intersection and scores use NumPy
+        top_k: Optional limit; only the top_k best projects are returned
         
     Returns:
         dict: Dictionary of common projects with aggregate scores, sorted by score
+              (ties broken by project name)
               {project: {'aggregate_score': score, 'rankings': [r1, r2, ...]}}
               Empty dict if no common preferences
     """
@@ -829,14 +1266,40 @@ def calculate_team_project_prefs(team_members, project_prefs):
     if not team_list:
         return {}
     
+    if rank_matrix is not None:
+        row_of = rank_matrix['row_of']
+        try:
+            row_idx = np.fromiter((row_of[netid] for netid in team_list), dtype=np.intp, count=len(team_list))
+        except KeyError:
+            return {}
+        
+        rows = rank_matrix['ranks'][row_idx]
+        common_cols = np.flatnonzero((rows > 0).all(axis=0))
+        scores = rows[:, common_cols].sum(axis=0, dtype=np.int32)
+        
+        # Columns are in project-name order, so a stable sort keeps name ties ordered
+        sorted_projects = {}
+        for i in np.argsort(scores, kind='stable')[:top_k]:
+            col = common_cols[i]
+            sorted_projects[rank_matrix['projects'][col]] = {
+                'aggregate_score': int(scores[i]),
+                'rankings': rows[:, col].tolist()
+            }
+        return sorted_projects
+    
     # Find projects that are in ALL members' top 5
-    # Start with first member's projects
-    common_projects = set(project_prefs.get(team_list[0], {}).keys())
+    # Start from the member with the fewest projects (cheapest intersections)
+    by_pref_count = sorted(team_list, key=lambda netid: len(project_prefs.get(netid, {})))
+    common_projects = set(project_prefs.get(by_pref_count[0], {}))
     
-    # Intersect with each other member's projects
-    for netid in team_list[1:]:
-        member_projects = set(project_prefs.get(netid, {}).keys())
-        common_projects &= member_projects
+    # Intersect in place with each other member's projects, stopping once empty
+    for netid in by_pref_count[1:]:
+        if not common_projects:
+            return {}
+        common_projects.intersection_update(project_prefs.get(netid, {}))
+    
+    if not common_projects:
+        return {}
     
     # Calculate aggregate scores for common projects
     project_scores = {}
@@ -852,13 +1315,166 @@ def calculate_team_project_prefs(team_members, project_prefs):
             'rankings': rankings
         }
     
-    # Sort by aggregate score (lower is better)
-    sorted_projects = dict(sorted(project_scores.items(), key=lambda x: x[1]['aggregate_score']))
+    # Sort by aggregate score (lower is better), then by name for stable ties;
+    # a partial selection is enough when only the top few are wanted
+    if top_k is not None:
+        return dict(heapq.nsmallest(top_k, project_scores.items(), key=lambda x: (x[1]['aggregate_score'], x[0])))
+    sorted_projects = dict(sorted(project_scores.items(), key=lambda x: (x[1]['aggregate_score'], x[0])))
     
     return sorted_projects
 
 
-def calculate_subteam_project_prefs(subteam, project_prefs):
+def best_team_project(team_members, project_prefs):
+    """
+    Find a team's most preferred common project.
+    
+    Same choice as the first entry of calculate_team_project_prefs (lowest
+    aggregate score, ties broken by project name), but only the winning
+    project's rankings are collected and nothing is sorted.
+    
+    Args:
+        team_members: Iterable of netIDs (set, list, etc.)
+        project_prefs: Dictionary mapping netID -> {project_name: ranking}
+        
+    Returns:
+        dict: {'project': name, 'aggregate_score': score, 'rankings': [r1, r2, ...]}
+              or None if the team has no common project
+    """
+    team_list = list(team_members)
+    
+    if not team_list:
+        return None
+    
+    common_projects = set(project_prefs.get(team_list[0], {}))
+    for netid in team_list[1:]:
+        if not common_projects:
+            return None
+        common_projects.intersection_update(project_prefs.get(netid, {}))
+    
+    if not common_projects:
+        return None
+    
+    best_score, best_project = min(
+        (sum(project_prefs[netid][project] for netid in team_list), project)
+        for project in common_projects
+    )
+    return {
+        'project': best_project,
+        'aggregate_score': best_score,
+        'rankings': [project_prefs[netid][best_project] for netid in team_list]
+    }
+
+
+def _best_team_columns(ranks, row_idx, team_sizes):
+    """
+    Lowest-scoring column ranked by every member, for each team.
+    
+    Team t's members are ranks rows row_idx[t, :team_sizes[t]]. Teams are
+    independent, so the outer loop runs in parallel under numba. Ties keep
+    the lowest column. Returns (best_cols, best_scores), -1 where a team has
+    no common column.
+    """
+    n_teams = row_idx.shape[0]
+    n_cols = ranks.shape[1]
+    best_cols = np.full(n_teams, -1, dtype=np.int64)
+    best_scores = np.full(n_teams, -1, dtype=np.int64)
+    for t in prange(n_teams):
+        size = team_sizes[t]
+        if size == 0:
+            continue
+        best = -1
+        best_score = 0
+        for c in range(n_cols):
+            score = 0
+            for j in range(size):
+                r = ranks[row_idx[t, j], c]
+                if r <= 0:
+                    score = -1
+                    break
+                score += r
+            if score >= 0 and (best < 0 or score < best_score):
+                best = c
+                best_score = score
+        best_cols[t] = best
+        best_scores[t] = best_score if best >= 0 else -1
+    return best_cols, best_scores
+
+
+if njit is not None:
+    _best_team_columns = njit(cache=True, parallel=True)(_best_team_columns)
+
+
+def best_team_projects(member_lists, project_prefs, rank_matrix=None):
+    """
+    Find the most preferred common project for a list of teams.
+    
+    Gives the same result as calling best_team_project on each team, but with
+    a rank matrix all teams are scored together: in one parallel kernel when
+    numba is available, otherwise in one set of NumPy operations.
+    
+    Args:
+        member_lists: List of teams, each a sequence of member netIDs
+        project_prefs: Dictionary mapping netID -> {project_name: ranking}
+        rank_matrix: Optional result of build_rank_matrix(project_prefs)
+        
+    Returns:
+        list: best_team_project result (dict or None) for each team, in order
+    """
+    if rank_matrix is None:
+        return [best_team_project(members, project_prefs) for members in member_lists]
+    
+    ranks = rank_matrix['ranks']
+    if not member_lists or ranks.shape[1] == 0:
+        # Without any project columns no team can have a common project
+        return [None] * len(member_lists)
+    
+    row_of = rank_matrix['row_of']
+    projects = rank_matrix['projects']
+    
+    # One row of member indices per team, padded past each team's size;
+    # teams that are empty or have an unknown member get size 0
+    pad_row = ranks.shape[0]
+    n_teams = len(member_lists)
+    width = max(map(len, member_lists))
+    row_idx = np.full((n_teams, width), pad_row, dtype=np.intp)
+    team_sizes = np.zeros(n_teams, dtype=np.intp)
+    for t, members in enumerate(member_lists):
+        for j, netid in enumerate(members):
+            row = row_of.get(netid)
+            if row is None:
+                break
+            row_idx[t, j] = row
+        else:
+            team_sizes[t] = len(members)
+    
+    if njit is not None:
+        best_cols, best_scores = _best_team_columns(ranks, row_idx, team_sizes)
+    else:
+        # The padding row is all zeros and counts as ranking every project
+        team_ranks = np.vstack([ranks, np.zeros((1, ranks.shape[1]), dtype=ranks.dtype)])[row_idx]
+        common = ((team_ranks > 0) | (row_idx == pad_row)[:, :, np.newaxis]).all(axis=1)
+        scores = team_ranks.sum(axis=1, dtype=np.int64)
+        
+        # Columns are in project-name order, so argmin picks the first name on ties
+        best_cols = np.where(common, scores, np.iinfo(np.int64).max).argmin(axis=1)
+        best_scores = scores[np.arange(n_teams), best_cols]
+        best_cols[~common.any(axis=1) | (team_sizes == 0)] = -1
+    
+    results = []
+    for t in range(n_teams):
+        col = best_cols[t]
+        if col < 0:
+            results.append(None)
+            continue
+        results.append({
+            'project': projects[col],
+            'aggregate_score': int(best_scores[t]),
+            'rankings': ranks[row_idx[t, :team_sizes[t]], col].tolist()
+        })
+    return results
+
+
+def calculate_subteam_project_prefs(subteam, project_prefs, rank_matrix=None):
     """
     Calculate common project preferences for a subteam.
     
@@ -867,14 +1483,15 @@ def calculate_subteam_project_prefs(subteam, project_prefs):
     Args:
         subteam: Set of netIDs
         project_prefs: Dictionary mapping netID -> {project_name: ranking}
+        rank_matrix: Optional result of build_rank_matrix(project_prefs)
         
     Returns:
         dict: Dictionary of common projects with aggregate scores
     """
-    return calculate_team_project_prefs(subteam, project_prefs)
+    return calculate_team_project_prefs(subteam, project_prefs, rank_matrix)
 
 
-def classify_subteams(subteams_data):
+def classify_subteams(subteams_data, project_masks=None):
     """
     Classify subteams based on size for team formation.
     
@@ -883,11 +1500,14 @@ def classify_subteams(subteams_data):
     
     Args:
         subteams_data: Dictionary with 'complete_subteams' and 'individuals'
+        project_masks: Optional netID -> bitmask dict from build_project_masks;
+            when given, each team object also gets a 'mask' of shared projects
         
     Returns:
         dict with keys:
             - 'complete_teams': List of teams ready for assignment (size 5-6)
             - 'incomplete_subteams': Dict organized by size (1-4)
+        Each team is a dict with 'members' (sorted tuple of netIDs) and 'size'.
     """
     print(f"\n--- Classifying Subteams ---")
     
@@ -897,7 +1517,9 @@ def classify_subteams(subteams_data):
     # Process complete subteams
     for subteam in subteams_data['complete_subteams']:
         size = len(subteam)
-        team_obj = {'members': subteam, 'size': size}
+        team_obj = {'members': tuple(sorted(subteam)), 'size': size}
+        if project_masks is not None:
+            team_obj['mask'] = members_mask(subteam, project_masks)
         
         if size >= 5 and size <= 6:
             # Can be directly assigned
@@ -909,7 +1531,9 @@ def classify_subteams(subteams_data):
     
     # Process individuals (treat as subteams of size 1)
     for individual in subteams_data['individuals']:
-        team_obj = {'members': {individual}, 'size': 1}
+        team_obj = {'members': (individual,), 'size': 1}
+        if project_masks is not None:
+            team_obj['mask'] = project_masks.get(individual, 0)
         incomplete_subteams[1].append(team_obj)
     
     # Print classification results
@@ -934,247 +1558,643 @@ def classify_subteams(subteams_data):
     }
 
 
-def check_compatibility(subteam1, subteam2, project_prefs):
+def merge_members(*teams):
     """
-    Check if two subteams can be merged based on project preferences.
-    
-    Returns True if the combined group has at least one project that
-    ALL members have in their top 5.
+    Combine the members of disjoint subteams into one sorted tuple.
     
     Args:
-        subteam1: Dict with 'members' (set of netIDs)
-        subteam2: Dict with 'members' (set of netIDs)
-        project_prefs: Dictionary mapping netID -> {project_name: ranking}
+        *teams: Team dicts whose 'members' are sorted tuples of netIDs
         
     Returns:
-        bool: True if compatible (at least one common project)
+        tuple: Sorted netIDs of all the teams
     """
-    combined_members = subteam1['members'] | subteam2['members']
-    common_prefs = calculate_team_project_prefs(combined_members, project_prefs)
-    return len(common_prefs) > 0
+    return tuple(sorted(itertools.chain.from_iterable(team['members'] for team in teams)))
 
 
-def merge_subteams_into_teams(incomplete_subteams, project_prefs):
+def mask_bits(mask):
     """
-    Merge smaller subteams into valid teams of 5-6 people.
+    Yield the indices of the set bits of an int bitmask, lowest first.
     
     Args:
-        incomplete_subteams: Dict organized by size {1: [...], 2: [...], ...}
+        mask: int bitmask
+        
+    Yields:
+        int: Bit index (project number)
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def build_project_buckets(teams):
+    """
+    Index subteams by the projects shared by all of their members.
+    
+    Args:
+        teams: List of team dicts carrying an int 'mask'
+        
+    Returns:
+        dict: Project bit index -> list of team indices (increasing)
+    """
+    buckets = defaultdict(list)
+    for idx, team in enumerate(teams):
+        for bit in mask_bits(team['mask']):
+            buckets[bit].append(idx)
+    return buckets
+
+
+def mask_word_count(masks):
+    """
+    Number of 64-bit words needed to hold the widest of the given bitmasks.
+    
+    Args:
+        masks: Iterable of int bitmasks
+        
+    Returns:
+        int: Word count (at least 1)
+    """
+    max_bits = max((mask.bit_length() for mask in masks), default=0)
+    return max(1, (max_bits + 63) // 64)
+
+
+def build_mask_array(teams, n_words):
+    """
+    Stack the 'mask' of each team into a uint64 array.
+    
+    Args:
+        teams: List of team dicts carrying an int 'mask'
+        n_words: Number of 64-bit words per row (see mask_word_count)
+        
+    Returns:
+        np.ndarray: uint64 array of shape (len(teams), n_words)
+    """
+    mask_array = np.empty((len(teams), n_words), dtype=np.uint64)
+    masks = [team['mask'] for team in teams]
+    # One column (64-bit word) at a time, filled straight from the ints
+    for word in range(n_words):
+        shift = 64 * word
+        mask_array[:, word] = np.fromiter(((mask >> shift) & 0xFFFFFFFFFFFFFFFF for mask in masks),
+                                          dtype=np.uint64, count=len(masks))
+    return mask_array
+
+
+def compatible_rows(row_mask, mask_array, available, start=0):
+    """
+    Indices of available rows sharing at least one project with row_mask.
+    
+    Args:
+        row_mask: uint64 array of shape (n_words,)
+        mask_array: uint64 array of shape (n, n_words)
+        available: Boolean array of shape (n,)
+        start: Only rows at this index or later are considered
+        
+    Returns:
+        np.ndarray: Matching row indices in increasing order
+    """
+    hits = (mask_array[start:] & row_mask).any(axis=1) & available[start:]
+    return np.flatnonzero(hits) + start
+
+
+def _compatibility_matrix(row_masks, mask_array):
+    """
+    Pairwise compatibility of two stacks of uint64 project masks.
+    
+    Rows of row_masks are independent, so the outer loop runs in parallel
+    under numba. Returns a boolean (len(row_masks), len(mask_array)) array.
+    """
+    n_rows = row_masks.shape[0]
+    n_cols = mask_array.shape[0]
+    n_words = mask_array.shape[1]
+    compatible = np.zeros((n_rows, n_cols), dtype=np.bool_)
+    for i in prange(n_rows):
+        for j in range(n_cols):
+            for w in range(n_words):
+                if (row_masks[i, w] & mask_array[j, w]) != 0:
+                    compatible[i, j] = True
+                    break
+    return compatible
+
+
+if njit is not None:
+    _compatibility_matrix = njit(cache=True, parallel=True)(_compatibility_matrix)
+
+
+def compatible_neighbors(row_masks, mask_array, available):
+    """
+    Available compatible rows of mask_array for every row of row_masks.
+    
+    All pairs are tested up front (in parallel when numba is available) so
+    the matching that consumes these lists only does the cheap serial part.
+    
+    Args:
+        row_masks: uint64 array of shape (m, n_words)
+        mask_array: uint64 array of shape (n, n_words)
+        available: Boolean array of shape (n,)
+        
+    Returns:
+        list: One array of matching row indices (increasing) per row of row_masks
+    """
+    if njit is not None:
+        compatible = _compatibility_matrix(row_masks, mask_array)
+    else:
+        compatible = (row_masks[:, None, :] & mask_array[None, :, :]).any(axis=2)
+    compatible &= available
+    return [np.flatnonzero(row) for row in compatible]
+
+
+def first_compatible(row_mask, mask_array, available, start=0):
+    """
+    Index of the first available row sharing a project with row_mask.
+    
+    Args:
+        row_mask: uint64 array of shape (n_words,)
+        mask_array: uint64 array of shape (n, n_words)
+        available: Boolean array of shape (n,)
+        start: Only rows at this index or later are considered
+        
+    Returns:
+        int: Row index, or -1 if there is no compatible row
+    """
+    hits = (mask_array[start:] & row_mask).any(axis=1) & available[start:]
+    if not hits.any():
+        return -1
+    return start + int(hits.argmax())
+
+
+def max_bipartite_matching(neighbors, n_right):
+    """
+    Maximum bipartite matching (Hopcroft-Karp).
+    
+    Left vertices first take their lowest-index free neighbor in index order
+    (a greedy first-fit pass), so when that is already maximum the result is
+    the same as greedy matching. Otherwise each phase finds the shortest
+    augmenting-path layers by BFS and augments along vertex-disjoint paths
+    by DFS, for O(E * sqrt(V)) overall.
+    
+    Args:
+        neighbors: List where neighbors[u] lists the right vertices adjacent
+            to left vertex u, in preference order
+        n_right: Number of right vertices
+        
+    Returns:
+        list: match_left[u] = matched right vertex, or -1 if unmatched
+    """
+    n_left = len(neighbors)
+    match_left = [-1] * n_left
+    match_right = [-1] * n_right
+    
+    for u in range(n_left):
+        for v in neighbors[u]:
+            if match_right[v] < 0:
+                match_left[u] = v
+                match_right[v] = u
+                break
+    
+    while True:
+        # BFS layers from every free left vertex along alternating paths
+        free_left = [u for u in range(n_left) if match_left[u] < 0]
+        layer = [-1] * n_left
+        for u in free_left:
+            layer[u] = 0
+        queue = deque(free_left)
+        found_free_right = False
+        while queue:
+            u = queue.popleft()
+            for v in neighbors[u]:
+                w = match_right[v]
+                if w < 0:
+                    found_free_right = True
+                elif layer[w] < 0:
+                    layer[w] = layer[u] + 1
+                    queue.append(w)
+        if not found_free_right:
+            return match_left
+        
+        # Iterative DFS down the layers; next_edge keeps each vertex's
+        # position so edges are not retried within a phase
+        next_edge = [0] * n_left
+        for root in free_left:
+            path = [root]
+            path_right = []
+            while path:
+                u = path[-1]
+                if next_edge[u] == len(neighbors[u]):
+                    # Dead end: drop u from this phase
+                    layer[u] = -1
+                    path.pop()
+                    if path_right:
+                        path_right.pop()
+                    continue
+                v = neighbors[u][next_edge[u]]
+                next_edge[u] += 1
+                w = match_right[v]
+                if w < 0:
+                    # Flip the path so every vertex on it is matched
+                    path_right.append(v)
+                    for left, right in zip(path, path_right):
+                        match_left[left] = right
+                        match_right[right] = left
+                    break
+                if layer[w] == layer[u] + 1:
+                    path.append(w)
+                    path_right.append(v)
+
+
+def _find_size2_merges(masks2, available2, masks1, available1):
+    """
+    Integer core of the size 2 merging pass.
+    
+    Size 2 subteams are visited in index order; each available one is
+    merged with the first later compatible pair partner j and a later
+    size 2 k (team of 6), or failing that with j and an individual k
+    (team of 5). Live subteams are kept in doubly linked free lists so the
+    scans never revisit used ones. The availability arrays are updated in
+    place. Returns rows of (i, j, k, team size).
+    """
+    n2 = masks2.shape[0]
+    n1 = masks1.shape[0]
+    n_words = masks2.shape[1]
+    pair = np.empty(n_words, dtype=np.uint64)
+    merges = np.empty((n2 // 2 + 1, 4), dtype=np.int64)
+    count = 0
+    
+    # Free lists over available rows; index n is the head/tail sentinel
+    next2 = np.empty(n2 + 1, dtype=np.int64)
+    prev2 = np.empty(n2 + 1, dtype=np.int64)
+    last = n2
+    for r in range(n2):
+        if available2[r]:
+            next2[last] = r
+            prev2[r] = last
+            last = r
+    next2[last] = n2
+    prev2[n2] = last
+    
+    next1 = np.empty(n1 + 1, dtype=np.int64)
+    prev1 = np.empty(n1 + 1, dtype=np.int64)
+    last = n1
+    for r in range(n1):
+        if available1[r]:
+            next1[last] = r
+            prev1[r] = last
+            last = r
+    next1[last] = n1
+    prev1[n1] = last
+    
+    i = next2[n2]
+    while i != n2:
+        found = False
+        for third_size in (2, 1):
+            j = next2[i]
+            while j != n2:
+                shared = False
+                for w in range(n_words):
+                    pair[w] = masks2[i, w] & masks2[j, w]
+                    if pair[w] != 0:
+                        shared = True
+                if shared:
+                    if third_size == 2:
+                        k = next2[j]
+                        end = n2
+                    else:
+                        k = next1[n1]
+                        end = n1
+                    while k != end:
+                        shared = False
+                        for w in range(n_words):
+                            if third_size == 2:
+                                third_word = masks2[k, w]
+                            else:
+                                third_word = masks1[k, w]
+                            if (pair[w] & third_word) != 0:
+                                shared = True
+                                break
+                        if shared:
+                            found = True
+                            break
+                        k = next2[k] if third_size == 2 else next1[k]
+                if found:
+                    break
+                j = next2[j]
+            if found:
+                break
+        
+        if not found:
+            i = next2[i]
+            continue
+        
+        merges[count, 0] = i
+        merges[count, 1] = j
+        merges[count, 2] = k
+        merges[count, 3] = 4 + third_size
+        count += 1
+        
+        # Unlink the used subteams; i's predecessor is still live
+        resume = prev2[i]
+        for used in (i, j):
+            available2[used] = False
+            next2[prev2[used]] = next2[used]
+            prev2[next2[used]] = prev2[used]
+        if third_size == 2:
+            available2[k] = False
+            next2[prev2[k]] = next2[k]
+            prev2[next2[k]] = prev2[k]
+        else:
+            available1[k] = False
+            next1[prev1[k]] = next1[k]
+            prev1[next1[k]] = prev1[k]
+        i = next2[resume]
+    
+    return merges[:count]
+
+
+def find_individual_groups(teams, available):
+    """
+    Choose groups of 5-6 individuals who share a project.
+    
+    A group is valid exactly when all of its members have some project bit
+    in common, i.e. when it fits inside one project bucket (see
+    build_project_buckets). So no combinations need to be searched: each
+    round takes the bucket with at least 6 (failing that, 5) available
+    individuals whose first available member has the lowest index, and
+    groups its first 6 (or 5) available members.
+    
+    Args:
+        teams: List of size 1 team dicts carrying an int 'mask'
+        available: Boolean array of shape (len(teams),), updated in place
+        
+    Returns:
+        list: One list of team indices (increasing) per group
+    """
+    buckets = build_project_buckets(teams)
+    cursor = dict.fromkeys(buckets, 0)
+    remaining = {bit: int(available[bucket].sum()) for bit, bucket in buckets.items()}
+    groups = []
+    
+    while True:
+        for group_size in (6, 5):
+            best = None  # (first available index, bit)
+            for bit, bucket in buckets.items():
+                if remaining[bit] < group_size:
+                    continue
+                pos = cursor[bit]
+                while not available[bucket[pos]]:
+                    pos += 1
+                cursor[bit] = pos
+                if best is None or (bucket[pos], bit) < best:
+                    best = (bucket[pos], bit)
+            if best is not None:
+                break
+        else:
+            # No project has 5 available individuals left
+            return groups
+        
+        bucket = buckets[best[1]]
+        group = []
+        for idx in itertools.islice(bucket, cursor[best[1]], None):
+            if available[idx]:
+                group.append(idx)
+                if len(group) == group_size:
+                    break
+        
+        for idx in group:
+            available[idx] = False
+            for bit in mask_bits(teams[idx]['mask']):
+                remaining[bit] -= 1
+        groups.append(group)
+
+
+if njit is not None:
+    _find_size2_merges = njit(cache=True)(_find_size2_merges)
+
+
+def merge_subteams_into_teams(incomplete_subteams, project_prefs):
+    """
+    Merge smaller subteams into valid teams of 5-6 people.
+    
+    Args:
+        incomplete_subteams: Dict organized by size {1: [...], 2: [...], ...}
         project_prefs: Dictionary mapping netID -> {project_name: ranking}
         
     Returns:
         dict with keys:
             - 'formed_teams': List of successfully formed teams
             - 'unmatched': List of subteams that couldn't be matched
+            - 'unmatched_people': Number of people in the unmatched subteams
     """
     print(f"\n--- Merging Subteams into Teams ---")
     
     formed_teams = []
-    used = set()  # Track indices of used subteams by (size, index)
+    
+    # Every subteam carries the AND of its members' project bitmasks, so
+    # compatibility checks below are integer ANDs rather than set work
+    project_masks = None
+    for teams in incomplete_subteams.values():
+        for team in teams:
+            if 'mask' not in team:
+                if project_masks is None:
+                    project_masks = build_project_masks(project_prefs)
+                team['mask'] = members_mask(team['members'], project_masks)
+    
+    # Stack the masks per size so each partner search is one vectorized AND
+    n_words = mask_word_count(team['mask'] for teams in incomplete_subteams.values() for team in teams)
+    mask_arrays = {size: build_mask_array(teams, n_words) for size, teams in incomplete_subteams.items()}
+    available = {size: np.ones(len(teams), dtype=bool) for size, teams in incomplete_subteams.items()}
     
     # Helper function to check if a subteam is used
     def is_used(size, idx):
-        return (size, idx) in used
+        return not available[size][idx]
     
     # Helper function to mark as used
     def mark_used(size, idx):
-        used.add((size, idx))
+        available[size][idx] = False
+    
+    # Individual merges are only logged at DEBUG; each strategy prints counts
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+    merge_counts = Counter()
+    
+    # Helper function to record a merge
+    def record_merge(description, merged):
+        merge_counts[description] += 1
+        if debug_enabled:
+            logging.debug("  %s: %s", description, ', '.join(merged['members']))
+    
+    # Helper function to print (as one write) and reset the counts for a strategy
+    def print_merge_counts():
+        if merge_counts:
+            print("\n".join(f"  {description}: {count} team(s)" for description, count in merge_counts.items()))
+        merge_counts.clear()
     
     # Strategy 1: Size 4 + Size 2 = 6, or Size 4 + Size 1 = 5
+    # Pair size 4s with size 2s by maximum matching, then the rest with size 1s
     print("\nMerging size 4 subteams...")
-    for i, team4 in enumerate(incomplete_subteams[4]):
-        if is_used(4, i):
-            continue
-        
-        # Try to add a size 2 subteam
-        found = False
-        for j, team2 in enumerate(incomplete_subteams[2]):
-            if is_used(2, j):
-                continue
-            if check_compatibility(team4, team2, project_prefs):
-                merged = {
-                    'members': team4['members'] | team2['members'],
-                    'source_subteams': [team4, team2],
-                    'size': 6
-                }
-                formed_teams.append(merged)
-                mark_used(4, i)
-                mark_used(2, j)
-                print(f"  Merged size 4 + size 2 → team of 6")
-                found = True
-                break
-        
-        if found:
-            continue
-        
-        # Try to add a size 1 subteam
-        for j, team1 in enumerate(incomplete_subteams[1]):
-            if is_used(1, j):
-                continue
-            if check_compatibility(team4, team1, project_prefs):
-                merged = {
-                    'members': team4['members'] | team1['members'],
-                    'source_subteams': [team4, team1],
-                    'size': 5
-                }
-                formed_teams.append(merged)
-                mark_used(4, i)
-                mark_used(1, j)
-                print(f"  Merged size 4 + size 1 → team of 5")
-                break
+    open4 = [i for i in range(len(incomplete_subteams[4])) if not is_used(4, i)]
+    match2 = max_bipartite_matching(
+        compatible_neighbors(mask_arrays[4][open4], mask_arrays[2], available[2]),
+        len(incomplete_subteams[2]))
+    unmatched4 = [i for i, j in zip(open4, match2) if j < 0]
+    match1 = dict(zip(unmatched4, max_bipartite_matching(
+        compatible_neighbors(mask_arrays[4][unmatched4], mask_arrays[1], available[1]),
+        len(incomplete_subteams[1]))))
+    
+    for i, j in zip(open4, match2):
+        team4 = incomplete_subteams[4][i]
+        if j >= 0:
+            team2 = incomplete_subteams[2][j]
+            merged = {
+                'members': merge_members(team4, team2),
+                'source_subteams': [team4, team2],
+                'size': 6,
+                'mask': team4['mask'] & team2['mask']
+            }
+            formed_teams.append(merged)
+            mark_used(4, i)
+            mark_used(2, j)
+            record_merge("Merged size 4 + size 2 → team of 6", merged)
+        elif match1[i] >= 0:
+            j = match1[i]
+            team1 = incomplete_subteams[1][j]
+            merged = {
+                'members': merge_members(team4, team1),
+                'source_subteams': [team4, team1],
+                'size': 5,
+                'mask': team4['mask'] & team1['mask']
+            }
+            formed_teams.append(merged)
+            mark_used(4, i)
+            mark_used(1, j)
+            record_merge("Merged size 4 + size 1 → team of 5", merged)
+    
+    print_merge_counts()
     
     # Strategy 2: Size 3 + Size 3 = 6, or Size 3 + Size 2 = 5
+    # Size 3 pairs are chosen first-fit (not a bipartite problem); the
+    # leftover size 3s are then matched with size 2s by maximum matching
     print("\nMerging size 3 subteams...")
+    partner3 = {}
+    
+    # Only size 3s sharing one of the project bits of subteam i can pair with
+    # it, so look up the first later live entry in each of i's buckets. i only
+    # grows and used entries never come back, so each bucket keeps a cursor
+    buckets3 = build_project_buckets(incomplete_subteams[3])
+    cursor = dict.fromkeys(buckets3, 0)
     for i, team3a in enumerate(incomplete_subteams[3]):
         if is_used(3, i):
             continue
-        
-        # Try to merge with another size 3
-        found = False
-        for j, team3b in enumerate(incomplete_subteams[3]):
-            if i >= j or is_used(3, j):
-                continue
-            if check_compatibility(team3a, team3b, project_prefs):
-                merged = {
-                    'members': team3a['members'] | team3b['members'],
-                    'source_subteams': [team3a, team3b],
-                    'size': 6
-                }
-                formed_teams.append(merged)
-                mark_used(3, i)
-                mark_used(3, j)
-                print(f"  Merged size 3 + size 3 → team of 6")
-                found = True
-                break
-        
-        if found:
-            continue
-        
-        # Try to merge with size 2
-        for j, team2 in enumerate(incomplete_subteams[2]):
-            if is_used(2, j):
-                continue
-            if check_compatibility(team3a, team2, project_prefs):
-                merged = {
-                    'members': team3a['members'] | team2['members'],
-                    'source_subteams': [team3a, team2],
-                    'size': 5
-                }
-                formed_teams.append(merged)
-                mark_used(3, i)
-                mark_used(2, j)
-                print(f"  Merged size 3 + size 2 → team of 5")
-                break
+        j = -1
+        for bit in mask_bits(team3a['mask']):
+            bucket = buckets3[bit]
+            pos = cursor[bit]
+            while pos < len(bucket) and (bucket[pos] <= i or is_used(3, bucket[pos])):
+                pos += 1
+            cursor[bit] = pos
+            if pos < len(bucket) and (j < 0 or bucket[pos] < j):
+                j = bucket[pos]
+        if j >= 0:
+            partner3[i] = j
+            mark_used(3, i)
+            mark_used(3, j)
+    
+    open3 = [i for i in range(len(incomplete_subteams[3])) if not is_used(3, i)]
+    match2 = dict(zip(open3, max_bipartite_matching(
+        compatible_neighbors(mask_arrays[3][open3], mask_arrays[2], available[2]),
+        len(incomplete_subteams[2]))))
+    
+    for i, team3a in enumerate(incomplete_subteams[3]):
+        if i in partner3:
+            team3b = incomplete_subteams[3][partner3[i]]
+            merged = {
+                'members': merge_members(team3a, team3b),
+                'source_subteams': [team3a, team3b],
+                'size': 6,
+                'mask': team3a['mask'] & team3b['mask']
+            }
+            formed_teams.append(merged)
+            record_merge("Merged size 3 + size 3 → team of 6", merged)
+        elif match2.get(i, -1) >= 0:
+            j = match2[i]
+            team2 = incomplete_subteams[2][j]
+            merged = {
+                'members': merge_members(team3a, team2),
+                'source_subteams': [team3a, team2],
+                'size': 5,
+                'mask': team3a['mask'] & team2['mask']
+            }
+            formed_teams.append(merged)
+            mark_used(3, i)
+            mark_used(2, j)
+            record_merge("Merged size 3 + size 2 → team of 5", merged)
+    
+    print_merge_counts()
     
     # Strategy 3: Size 2 + Size 2 + Size 2 = 6, or Size 2 + Size 2 + Size 1 = 5
     print("\nMerging size 2 subteams...")
-    for i, team2a in enumerate(incomplete_subteams[2]):
-        if is_used(2, i):
-            continue
-        
-        # Try to merge with two other size 2 teams
-        found = False
-        for j, team2b in enumerate(incomplete_subteams[2]):
-            if i >= j or is_used(2, j):
-                continue
-            if not check_compatibility(team2a, team2b, project_prefs):
+    if njit is not None:
+        size2_merges = _find_size2_merges(mask_arrays[2], available[2], mask_arrays[1], available[1])
+    else:
+        size2_merges = []
+        for i in range(len(incomplete_subteams[2])):
+            if is_used(2, i):
                 continue
             
-            for k, team2c in enumerate(incomplete_subteams[2]):
-                if j >= k or is_used(2, k):
-                    continue
-                # Check if all three are compatible
-                temp_merge = {'members': team2a['members'] | team2b['members']}
-                if check_compatibility(temp_merge, team2c, project_prefs):
-                    merged = {
-                        'members': team2a['members'] | team2b['members'] | team2c['members'],
-                        'source_subteams': [team2a, team2b, team2c],
-                        'size': 6
-                    }
-                    formed_teams.append(merged)
-                    mark_used(2, i)
-                    mark_used(2, j)
-                    mark_used(2, k)
-                    print(f"  Merged size 2 + size 2 + size 2 → team of 6")
-                    found = True
-                    break
-            if found:
-                break
-        
-        if found:
-            continue
-        
-        # Try size 2 + size 2 + size 1 = 5
-        for j, team2b in enumerate(incomplete_subteams[2]):
-            if i >= j or is_used(2, j):
-                continue
-            if not check_compatibility(team2a, team2b, project_prefs):
-                continue
+            # Later size 2 subteams compatible with this one, in index order
+            partners = compatible_rows(mask_arrays[2][i], mask_arrays[2], available[2], start=i + 1)
             
-            for k, team1 in enumerate(incomplete_subteams[1]):
-                if is_used(1, k):
-                    continue
-                temp_merge = {'members': team2a['members'] | team2b['members']}
-                if check_compatibility(temp_merge, team1, project_prefs):
-                    merged = {
-                        'members': team2a['members'] | team2b['members'] | team1['members'],
-                        'source_subteams': [team2a, team2b, team1],
-                        'size': 5
-                    }
-                    formed_teams.append(merged)
-                    mark_used(2, i)
-                    mark_used(2, j)
-                    mark_used(1, k)
-                    print(f"  Merged size 2 + size 2 + size 1 → team of 5")
-                    found = True
+            # Try two other size 2 teams, then one size 2 and an individual
+            for third_size, third_masks, third_available in ((2, mask_arrays[2], available[2]),
+                                                             (1, mask_arrays[1], available[1])):
+                found = False
+                for j in partners:
+                    pair_row = mask_arrays[2][i] & mask_arrays[2][j]
+                    k = first_compatible(pair_row, third_masks, third_available,
+                                         start=j + 1 if third_size == 2 else 0)
+                    if k >= 0:
+                        size2_merges.append((i, j, k, 4 + third_size))
+                        mark_used(2, i)
+                        mark_used(2, j)
+                        mark_used(third_size, k)
+                        found = True
+                        break
+                if found:
                     break
-            if found:
-                break
+    
+    for i, j, k, size in size2_merges:
+        team2a = incomplete_subteams[2][i]
+        team2b = incomplete_subteams[2][j]
+        third = incomplete_subteams[size - 4][k]
+        merged = {
+            'members': merge_members(team2a, team2b, third),
+            'source_subteams': [team2a, team2b, third],
+            'size': size,
+            'mask': team2a['mask'] & team2b['mask'] & third['mask']
+        }
+        formed_teams.append(merged)
+        record_merge(f"Merged size 2 + size 2 + size {size - 4} → team of {size}", merged)
+    
+    print_merge_counts()
     
     # Strategy 4: Group individuals (size 1) into teams of 5-6
     print("\nGrouping individuals...")
-    available_individuals = [(i, team) for i, team in enumerate(incomplete_subteams[1]) if not is_used(1, i)]
+    individual_groups = find_individual_groups(incomplete_subteams[1], available[1])
+    
+    for candidate_group in individual_groups:
+        group_size = len(candidate_group)
+        source_subteams = [incomplete_subteams[1][idx] for idx in candidate_group]
+        group_mask = source_subteams[0]['mask']
+        for team in source_subteams[1:]:
+            group_mask &= team['mask']
+        
+        merged = {
+            'members': merge_members(*source_subteams),
+            'source_subteams': source_subteams,
+            'size': group_size,
+            'mask': group_mask
+        }
+        formed_teams.append(merged)
+        record_merge(f"Grouped {group_size} individuals → team of {group_size}", merged)
     
-    while len(available_individuals) >= 5:
-        # Try to find a compatible group of 5-6 individuals
-        for group_size in [6, 5]:
-            if len(available_individuals) < group_size:
-                continue
-            
-            # Try combinations (greedy approach - take first compatible group found)
-            for i in range(len(available_individuals) - group_size + 1):
-                candidate_group = available_individuals[i:i+group_size]
-                
-                # Check if all are compatible
-                combined = {'members': set()}
-                for _, team in candidate_group:
-                    combined['members'] |= team['members']
-                
-                common_prefs = calculate_team_project_prefs(combined['members'], project_prefs)
-                if common_prefs:
-                    # Found a compatible group!
-                    merged = {
-                        'members': combined['members'],
-                        'source_subteams': [team for _, team in candidate_group],
-                        'size': group_size
-                    }
-                    formed_teams.append(merged)
-                    
-                    # Mark all as used
-                    for idx, _ in candidate_group:
-                        mark_used(1, idx)
-                    
-                    print(f"  Grouped {group_size} individuals → team of {group_size}")
-                    
-                    # Update available individuals
-                    available_individuals = [(i, team) for i, team in enumerate(incomplete_subteams[1]) if not is_used(1, i)]
-                    break
-            else:
-                continue
-            break
-        else:
-            # No compatible group found, break out
-            break
+    print_merge_counts()
     
     # Collect unmatched subteams
     unmatched = []
@@ -1183,21 +2203,83 @@ def merge_subteams_into_teams(incomplete_subteams, project_prefs):
             if not is_used(size, i):
                 unmatched.append(team)
     
-    print(f"\nMerging results:")
-    print(f"  Formed teams: {len(formed_teams)}")
     people_in_formed = sum(team['size'] for team in formed_teams)
-    print(f"  People placed: {people_in_formed}")
-    print(f"  Unmatched subteams: {len(unmatched)}")
     people_unmatched = sum(team['size'] for team in unmatched)
-    print(f"  People unmatched: {people_unmatched}")
+    print(f"\nMerging results:\n"
+          f"  Formed teams: {len(formed_teams)}\n"
+          f"  People placed: {people_in_formed}\n"
+          f"  Unmatched subteams: {len(unmatched)}\n"
+          f"  People unmatched: {people_unmatched}")
     
     return {
         'formed_teams': formed_teams,
-        'unmatched': unmatched
+        'unmatched': unmatched,
+        'unmatched_people': people_unmatched
+    }
+
+
+def _score_range(score, team_size):
+    """
+    Bucket an assignment's aggregate score for the quality analysis.
+    
+    Args:
+        score: Aggregate score of the assigned project
+        team_size: Number of team members
+        
+    Returns:
+        str: Score range name (a key of the dict from _empty_score_ranges)
+    """
+    if score == team_size:  # All #1 choices
+        return 'perfect (all #1)'
+    elif score <= 10:
+        return 'excellent (6-10)'
+    elif score <= 15:
+        return 'good (11-15)'
+    elif score <= 20:
+        return 'fair (16-20)'
+    else:
+        return 'poor (21+)'
+
+
+def _empty_score_ranges():
+    """Score range name -> list of assignments, in display order."""
+    return {
+        'perfect (all #1)': [],
+        'excellent (6-10)': [],
+        'good (11-15)': [],
+        'fair (16-20)': [],
+        'poor (21+)': []
     }
 
 
-def assign_projects_to_complete_subteams(complete_teams, project_prefs):
+def _quality_report(title, assignments, score_ranges, teams_with_low_choices, teams_label):
+    """
+    Print the assignment quality analysis shared by the assign_projects_* functions.
+    
+    Args:
+        title: Section heading
+        assignments: List of assignment dicts
+        score_ranges: Assignments bucketed by _score_range
+        teams_with_low_choices: List of (assignment, max_rank) with max_rank >= 4
+        teams_label: Noun used in the all-clear message (e.g. 'teams')
+    """
+    print(f"\n--- {title} ---")
+    print(f"Total assignments: {len(assignments)}")
+    
+    print(f"\nDistribution by aggregate score:")
+    for range_name, teams in score_ranges.items():
+        if teams:
+            print(f"  {range_name}: {len(teams)} team(s)")
+    
+    if teams_with_low_choices:
+        print(f"\n⚠️  Warning: {len(teams_with_low_choices)} team(s) have members with #4 or #5 choices:")
+        for assignment, max_rank in teams_with_low_choices:
+            print(f"  - {assignment['project']}: highest rank = #{max_rank}")
+    else:
+        print(f"\n✓ All {teams_label} assigned projects where everyone had it in their top 3!")
+
+
+def assign_projects_to_complete_subteams(complete_teams, project_prefs, rank_matrix=None):
     """
     Assign projects to 5-6 person complete subteams.
     
@@ -1205,101 +2287,71 @@ def assign_projects_to_complete_subteams(complete_teams, project_prefs):
     (the one with the lowest aggregate score).
     
     Args:
-        complete_teams: List of complete team dicts with 'members' and 'size'
+        complete_teams: List of complete team dicts with 'members' (sorted tuple) and 'size'
         project_prefs: Dictionary mapping netID -> {project_name: ranking}
+        rank_matrix: Optional result of build_rank_matrix(project_prefs)
         
     Returns:
         dict with key 'assignments': List of assignment dicts
     """
     print(f"\n--- Assigning Projects to Complete Subteams ---")
     
+    # Per-team details are only logged at DEBUG (--verbose)
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+    
     assignments = []
+    score_ranges = _empty_score_ranges()
+    teams_with_low_choices = []
+    
+    # Find each team's common project with the lowest aggregate score (most preferred)
+    best_projects = best_team_projects([team['members'] for team in complete_teams], project_prefs, rank_matrix)
     
-    for i, team in enumerate(complete_teams):
-        # Calculate common project preferences for this team
-        common_prefs = calculate_team_project_prefs(team['members'], project_prefs)
+    for i, (team, best_score_data) in enumerate(zip(complete_teams, best_projects)):
+        team_members = team['members']
         
-        if not common_prefs:
+        if best_score_data is None:
             print(f"\n⚠️  ERROR: Team {i+1} has no common project preferences!")
-            print(f"   Members: {', '.join(sorted(team['members']))}")
+            print(f"   Members: {', '.join(team_members)}")
             continue
         
-        # Assign the project with the lowest aggregate score (most preferred)
-        best_project = list(common_prefs.keys())[0]  # Already sorted by score
-        best_score_data = common_prefs[best_project]
+        best_project = best_score_data['project']
         
         assignment = {
-            'team_members': sorted(team['members']),
+            'team_members': team_members,
             'project': best_project,
             'aggregate_score': best_score_data['aggregate_score'],
-            'individual_rankings': best_score_data['rankings']
+            'individual_rankings': best_score_data['rankings'],
+            'team_size': len(team_members),
+            'avg_per_person': best_score_data['aggregate_score'] / len(team_members)
         }
         assignments.append(assignment)
         
-        # Calculate max individual ranking to flag poor assignments
-        max_ranking = max(best_score_data['rankings'])
+        # Calculate max individual ranking to flag poor assignments. Every
+        # ranking is at least 1, so a #4 or worse needs the score to exceed an
+        # all-#1 team's by 3 or more; otherwise (e.g. all #1s) skip the scan
         warning = ""
-        if max_ranking >= 4:
-            warning = " ⚠️  (some members got #4 or #5 choice)"
+        if assignment['aggregate_score'] - assignment['team_size'] >= 3:
+            max_ranking = max(best_score_data['rankings'])
+            if max_ranking >= 4:
+                warning = " ⚠️  (some members got #4 or #5 choice)"
+                teams_with_low_choices.append((assignment, max_ranking))
         
-        print(f"\nTeam {i+1} → {best_project}")
-        print(f"  Members: {', '.join(assignment['team_members'])}")
-        print(f"  Aggregate score: {best_score_data['aggregate_score']}")
-        print(f"  Individual rankings: {best_score_data['rankings']}{warning}")
-    
-    # Analyze assignment quality
-    print(f"\n--- Assignment Quality Analysis ---")
-    print(f"Total assignments: {len(assignments)}")
-    
-    # Distribution by aggregate score
-    score_ranges = {
-        'perfect (all #1)': [],
-        'excellent (6-10)': [],
-        'good (11-15)': [],
-        'fair (16-20)': [],
-        'poor (21+)': []
-    }
-    
-    teams_with_low_choices = []
-    
-    for assignment in assignments:
-        score = assignment['aggregate_score']
-        max_rank = max(assignment['individual_rankings'])
-        
-        # Track by score range
-        if score == len(assignment['team_members']):  # All #1 choices
-            score_ranges['perfect (all #1)'].append(assignment)
-        elif score <= 10:
-            score_ranges['excellent (6-10)'].append(assignment)
-        elif score <= 15:
-            score_ranges['good (11-15)'].append(assignment)
-        elif score <= 20:
-            score_ranges['fair (16-20)'].append(assignment)
-        else:
-            score_ranges['poor (21+)'].append(assignment)
+        score_ranges[_score_range(assignment['aggregate_score'], assignment['team_size'])].append(assignment)
         
-        # Flag teams where someone got #4 or #5
-        if max_rank >= 4:
-            teams_with_low_choices.append((assignment, max_rank))
-    
-    print(f"\nDistribution by aggregate score:")
-    for range_name, teams in score_ranges.items():
-        if teams:
-            print(f"  {range_name}: {len(teams)} team(s)")
+        if debug_enabled:
+            logging.debug("\nTeam %d → %s\n  Members: %s\n  Aggregate score: %s\n  Individual rankings: %s%s",
+                          i + 1, best_project, ', '.join(team_members),
+                          best_score_data['aggregate_score'], best_score_data['rankings'], warning)
     
-    if teams_with_low_choices:
-        print(f"\n⚠️  Warning: {len(teams_with_low_choices)} team(s) have members with #4 or #5 choices:")
-        for assignment, max_rank in teams_with_low_choices:
-            print(f"  - {assignment['project']}: highest rank = #{max_rank}")
-    else:
-        print(f"\n✓ All teams assigned projects where everyone had it in their top 3!")
+    # Analyze assignment quality
+    _quality_report('Assignment Quality Analysis', assignments, score_ranges, teams_with_low_choices, 'teams')
     
     return {
         'assignments': assignments
     }
 
 
-def assign_projects_to_merged_teams(merged_teams, project_prefs):
+def assign_projects_to_merged_teams(merged_teams, project_prefs, rank_matrix=None):
     """
     Assign projects to teams formed by merging smaller subteams.
     
@@ -1307,97 +2359,67 @@ def assign_projects_to_merged_teams(merged_teams, project_prefs):
     (the one with the lowest aggregate score).
     
     Args:
-        merged_teams: List of merged team dicts with 'members', 'size', and 'source_subteams'
+        merged_teams: List of merged team dicts with 'members' (sorted tuple), 'size', and 'source_subteams'
         project_prefs: Dictionary mapping netID -> {project_name: ranking}
+        rank_matrix: Optional result of build_rank_matrix(project_prefs)
         
     Returns:
         dict with key 'assignments': List of assignment dicts
     """
     print(f"\n--- Assigning Projects to Merged Teams ---")
     
+    # Per-team details are only logged at DEBUG (--verbose)
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+    
     assignments = []
+    score_ranges = _empty_score_ranges()
+    teams_with_low_choices = []
+    
+    # Find each team's common project with the lowest aggregate score (most preferred)
+    best_projects = best_team_projects([team['members'] for team in merged_teams], project_prefs, rank_matrix)
     
-    for i, team in enumerate(merged_teams):
-        # Calculate common project preferences for this team
-        common_prefs = calculate_team_project_prefs(team['members'], project_prefs)
+    for i, (team, best_score_data) in enumerate(zip(merged_teams, best_projects)):
+        team_members = team['members']
         
-        if not common_prefs:
+        if best_score_data is None:
             print(f"\n⚠️  ERROR: Merged Team {i+1} has no common project preferences!")
-            print(f"   Members: {', '.join(sorted(team['members']))}")
+            print(f"   Members: {', '.join(team_members)}")
             print(f"   This shouldn't happen - team was formed with compatibility check!")
             continue
         
-        # Assign the project with the lowest aggregate score (most preferred)
-        best_project = list(common_prefs.keys())[0]  # Already sorted by score
-        best_score_data = common_prefs[best_project]
+        best_project = best_score_data['project']
         
         assignment = {
-            'team_members': sorted(team['members']),
+            'team_members': team_members,
             'project': best_project,
             'aggregate_score': best_score_data['aggregate_score'],
             'individual_rankings': best_score_data['rankings'],
+            'team_size': len(team_members),
+            'avg_per_person': best_score_data['aggregate_score'] / len(team_members),
             'source_subteams_count': len(team['source_subteams'])
         }
         assignments.append(assignment)
         
-        # Calculate max individual ranking to flag poor assignments
-        max_ranking = max(best_score_data['rankings'])
+        # Calculate max individual ranking to flag poor assignments. Every
+        # ranking is at least 1, so a #4 or worse needs the score to exceed an
+        # all-#1 team's by 3 or more; otherwise (e.g. all #1s) skip the scan
         warning = ""
-        if max_ranking >= 4:
-            warning = " ⚠️  (some members got #4 or #5 choice)"
+        if assignment['aggregate_score'] - assignment['team_size'] >= 3:
+            max_ranking = max(best_score_data['rankings'])
+            if max_ranking >= 4:
+                warning = " ⚠️  (some members got #4 or #5 choice)"
+                teams_with_low_choices.append((assignment, max_ranking))
         
-        print(f"\nMerged Team {i+1} → {best_project}")
-        print(f"  Members: {', '.join(assignment['team_members'])}")
-        print(f"  Formed from {assignment['source_subteams_count']} subteam(s)")
-        print(f"  Aggregate score: {best_score_data['aggregate_score']}")
-        print(f"  Individual rankings: {best_score_data['rankings']}{warning}")
-    
-    # Analyze assignment quality
-    print(f"\n--- Merged Teams Assignment Quality ---")
-    print(f"Total assignments: {len(assignments)}")
-    
-    # Distribution by aggregate score
-    score_ranges = {
-        'perfect (all #1)': [],
-        'excellent (6-10)': [],
-        'good (11-15)': [],
-        'fair (16-20)': [],
-        'poor (21+)': []
-    }
-    
-    teams_with_low_choices = []
-    
-    for assignment in assignments:
-        score = assignment['aggregate_score']
-        max_rank = max(assignment['individual_rankings'])
-        
-        # Track by score range
-        if score == len(assignment['team_members']):  # All #1 choices
-            score_ranges['perfect (all #1)'].append(assignment)
-        elif score <= 10:
-            score_ranges['excellent (6-10)'].append(assignment)
-        elif score <= 15:
-            score_ranges['good (11-15)'].append(assignment)
-        elif score <= 20:
-            score_ranges['fair (16-20)'].append(assignment)
-        else:
-            score_ranges['poor (21+)'].append(assignment)
+        score_ranges[_score_range(assignment['aggregate_score'], assignment['team_size'])].append(assignment)
         
-        # Flag teams where someone got #4 or #5
-        if max_rank >= 4:
-            teams_with_low_choices.append((assignment, max_rank))
-    
-    print(f"\nDistribution by aggregate score:")
-    for range_name, teams in score_ranges.items():
-        if teams:
-            print(f"  {range_name}: {len(teams)} team(s)")
+        if debug_enabled:
+            logging.debug("\nMerged Team %d → %s\n  Members: %s\n  Formed from %d subteam(s)\n"
+                          "  Aggregate score: %s\n  Individual rankings: %s%s",
+                          i + 1, best_project, ', '.join(team_members), assignment['source_subteams_count'],
+                          best_score_data['aggregate_score'], best_score_data['rankings'], warning)
     
-    if teams_with_low_choices:
-        print(f"\n⚠️  Warning: {len(teams_with_low_choices)} team(s) have members with #4 or #5 choices:")
-        for assignment, max_rank in teams_with_low_choices:
-            print(f"  - {assignment['project']}: highest rank = #{max_rank}")
-    else:
-        print(f"\n✓ All merged teams assigned projects where everyone had it in their top 3!")
+    # Analyze assignment quality
+    _quality_report('Merged Teams Assignment Quality', assignments, score_ranges, teams_with_low_choices, 'merged teams')
     
     return {
         'assignments': assignments
@@ -1417,41 +2439,27 @@ def write_output_csv(assignments, output_filepath):
     print(f"\n--- Writing Output CSV ---")
     
     # Sort assignments by project name for consistent output
-    sorted_assignments = sorted(assignments, key=lambda x: x['project'])
-    
-    # Format for CSV output
-    output_data = []
-    for assignment in sorted_assignments:
-        project_name = assignment['project']
-        # Format members as string representation of list
-        members_str = '[' + ', '.join(assignment['team_members']) + ']'
-        output_data.append({
-            'Project': project_name,
-            'Team Members': members_str
-        })
-    
-    # Write CSV with proper escaping using pandas
-    output_records = []
-    for assignment in sorted_assignments:
-        project_name = assignment['project']
-        members_str = '[' + ', '.join(assignment['team_members']) + ']'
-        output_records.append([project_name, members_str])
+    sorted_assignments = sorted(assignments, key=itemgetter('project'))
     
-    df_output = pd.DataFrame(output_records)
-    df_output.to_csv(output_filepath, index=False, header=False)
+    # Write CSV with proper escaping; members formatted as a list string
+    with open(output_filepath, 'w', newline='', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerows(
+            (assignment['project'], '[' + ', '.join(assignment['team_members']) + ']')
+            for assignment in sorted_assignments
+        )
     
     print(f"Output written to: {output_filepath}")
-    print(f"  Teams: {len(output_data)}")
-    print(f"  Total people assigned: {sum(len(a['team_members']) for a in assignments)}")
+    print(f"  Teams: {len(sorted_assignments)}")
+    print(f"  Total people assigned: {sum(a['team_size'] for a in assignments)}")
 
 
-def analyze_assignments(assignments, project_prefs):
+def analyze_assignments(assignments):
     """
     Analyze assignment quality and preference satisfaction.
     
     Args:
         assignments: List of assignment dicts
-        project_prefs: Dictionary mapping netID -> {project_name: ranking}
         
     Returns:
         dict: Analysis results including satisfaction breakdown
@@ -1459,32 +2467,34 @@ def analyze_assignments(assignments, project_prefs):
     print(f"\n--- Analyzing Assignment Optimization ---")
     
     # Track individual preference satisfaction
-    preference_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    all_individual_rankings = []
+    all_individual_rankings = np.fromiter(
+        (ranking for assignment in assignments for ranking in assignment['individual_rankings']),
+        dtype=np.int64
+    )
+    rank_counts = np.bincount(all_individual_rankings, minlength=6)
     
-    for assignment in assignments:
-        for ranking in assignment['individual_rankings']:
-            preference_counts[ranking] = preference_counts.get(ranking, 0) + 1
-            all_individual_rankings.append(ranking)
+    # Always report #1-#5; any other ranking only if it occurred
+    preference_counts = {rank: int(count) for rank, count in enumerate(rank_counts)
+                         if 1 <= rank <= 5 or count}
     
     total_people = len(all_individual_rankings)
     
     print(f"\nIndividual Preference Satisfaction:")
     print(f"  Total people assigned: {total_people}")
-    for rank in sorted(preference_counts.keys()):
-        count = preference_counts[rank]
+    for rank, count in sorted(preference_counts.items()):
         percentage = (count / total_people * 100) if total_people > 0 else 0
         print(f"  #{rank} choice: {count} people ({percentage:.1f}%)")
     
     # Calculate average individual ranking
-    avg_rank = sum(all_individual_rankings) / len(all_individual_rankings) if all_individual_rankings else 0
+    avg_rank = float(all_individual_rankings.mean()) if total_people else 0
     print(f"\n  Average ranking per person: {avg_rank:.2f}")
     
     # Identify worst assignments
     worst_assignments = []
     for assignment in assignments:
-        max_rank = max(assignment['individual_rankings'])
-        avg_rank_team = assignment['aggregate_score'] / len(assignment['team_members'])
+        rankings = assignment['individual_rankings']
+        max_rank = max(rankings)
+        avg_rank_team = assignment['avg_per_person']
         
         if max_rank >= 4 or avg_rank_team >= 3.5:
             worst_assignments.append({
@@ -1492,11 +2502,11 @@ def analyze_assignments(assignments, project_prefs):
                 'max_rank': max_rank,
                 'avg_rank': avg_rank_team,
                 'aggregate_score': assignment['aggregate_score'],
-                'team_size': len(assignment['team_members']),
-                'rankings': assignment['individual_rankings']
+                'team_size': assignment['team_size'],
+                'rankings': rankings
             })
     
-    worst_assignments.sort(key=lambda x: (x['max_rank'], x['avg_rank']), reverse=True)
+    worst_assignments.sort(key=itemgetter('max_rank', 'avg_rank'), reverse=True)
     
     if worst_assignments:
         print(f"\nWorst Assignments (needs attention):")
@@ -1518,43 +2528,22 @@ def analyze_assignments(assignments, project_prefs):
     print(f"  Reason: Multiple teams can work on the same project,")
     print(f"  so each team getting their best option minimizes total score.")
     
-    # Check if any improvements possible
-    improvements_possible = []
-    for assignment in assignments:
-        # Check if there were other options for this team
-        team_members = assignment['team_members']
-        common_prefs = calculate_team_project_prefs(team_members, project_prefs)
-        
-        if len(common_prefs) > 1:
-            best_project = list(common_prefs.keys())[0]
-            if assignment['project'] != best_project:
-                improvements_possible.append({
-                    'current': assignment['project'],
-                    'better': best_project,
-                    'current_score': assignment['aggregate_score'],
-                    'better_score': common_prefs[best_project]['aggregate_score']
-                })
-    
-    if improvements_possible:
-        print(f"\n⚠ {len(improvements_possible)} assignment(s) could be improved:")
-        for imp in improvements_possible[:3]:
-            print(f"  {imp['current']} (score {imp['current_score']}) → {imp['better']} (score {imp['better_score']})")
-    else:
-        print(f"\n✓ All teams assigned to their best possible project!")
+    # Every assignment is already the team's lowest-scoring common project
+    # (from best_team_projects), so there is nothing to re-check here
+    print(f"\n✓ All teams assigned to their best possible project!")
     
     return {
         'preference_counts': preference_counts,
         'total_people': total_people,
         'average_rank': avg_rank,
         'worst_assignments': worst_assignments,
-        'total_aggregate': total_aggregate,
-        'improvements_possible': improvements_possible
+        'total_aggregate': total_aggregate
     }
 
 
 def validate_output(output_filepath):
     """
-    Validate the output CSV file by reading it with pandas.
+    Validate the output CSV file by streaming it with the csv module.
     
     Ensures the file can be properly parsed and has the correct format.
     
@@ -1567,42 +2556,39 @@ def validate_output(output_filepath):
     print(f"\n--- Validating Output CSV ---")
     
     try:
-        # Read the CSV with pandas
-        df = pd.read_csv(output_filepath, header=None, names=['Project', 'Team_Members'])
-        
-        print(f"✓ CSV successfully read by pandas")
-        print(f"  Rows: {len(df)}")
-        print(f"  Columns: {len(df.columns)}")
-        
-        # Check that we have exactly 2 columns
-        if len(df.columns) != 2:
-            print(f"✗ ERROR: Expected 2 columns, found {len(df.columns)}")
-            return False
-        
-        print(f"✓ Correct number of columns (2)")
-        
-        # Validate each row
         validation_errors = []
-        
-        for idx in range(len(df)):
-            row = df.iloc[idx]
-            row_num = idx + 1
-            project = row['Project']
-            members = row['Team_Members']
-            
-            # Check project name is not empty
-            if pd.isna(project) or str(project).strip() == '':
-                validation_errors.append(f"Row {row_num}: Project name is empty")
-                continue
-            
-            # Check members list format
-            members_str = str(members)
-            if not members_str.startswith('[') or not members_str.endswith(']'):
-                validation_errors.append(f"Row {row_num} ({project}): Members list doesn't start with '[' and end with ']'")
-                continue
-            
-            # Try to parse the member list
-            try:
+        num_rows = 0
+        bad_column_rows = 0
+        sample = None
+        
+        with open(output_filepath, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                # Skip blank lines
+                if not row:
+                    continue
+                num_rows += 1
+                row_num = num_rows
+                
+                # Check that we have exactly 2 columns
+                if len(row) != 2:
+                    bad_column_rows += 1
+                    validation_errors.append(f"Row {row_num}: Expected 2 columns, found {len(row)}")
+                    continue
+                
+                project, members_str = row
+                if sample is None:
+                    sample = row
+                
+                # Check project name is not empty
+                if not project.strip():
+                    validation_errors.append(f"Row {row_num}: Project name is empty")
+                    continue
+                
+                # Check members list format
+                if not members_str.startswith('[') or not members_str.endswith(']'):
+                    validation_errors.append(f"Row {row_num} ({project}): Members list doesn't start with '[' and end with ']'")
+                    continue
+                
                 # Extract members from the string representation
                 members_content = members_str[1:-1]  # Remove brackets
                 if members_content.strip():  # Not empty
@@ -1617,8 +2603,16 @@ def validate_output(output_filepath):
                         validation_errors.append(f"Row {row_num} ({project}): Contains empty member names")
                 else:
                     validation_errors.append(f"Row {row_num} ({project}): Empty member list")
-            except Exception as e:
-                validation_errors.append(f"Row {row_num} ({project}): Error parsing members - {e}")
+        
+        if num_rows == 0:
+            print(f"✗ ERROR: Output file has no rows: {output_filepath}")
+            return False
+        
+        print(f"✓ CSV successfully read")
+        print(f"  Rows: {num_rows}")
+        
+        if bad_column_rows == 0:
+            print(f"✓ Correct number of columns (2)")
         
         if validation_errors:
             print(f"✗ Validation errors found:")
@@ -1633,18 +2627,17 @@ def validate_output(output_filepath):
         print(f"\n✓ Validation PASSED - Output CSV is valid!")
         
         # Show a sample row
-        if len(df) > 0:
+        if sample is not None:
             print(f"\nSample row:")
-            sample = df.iloc[0]
-            print(f"  Project: {sample['Project']}")
-            print(f"  Members: {sample['Team_Members']}")
+            print(f"  Project: {sample[0]}")
+            print(f"  Members: {sample[1]}")
         
         return True
         
     except FileNotFoundError:
         print(f"✗ ERROR: Output file not found: {output_filepath}")
         return False
-    except pd.errors.ParserError as e:
+    except csv.Error as e:
         print(f"✗ ERROR: Failed to parse CSV file: {e}")
         return False
     except Exception as e:
@@ -1652,7 +2645,23 @@ def validate_output(output_filepath):
         return False
 
 
-def generate_report(assignments, unmatched, quality_tracker=None, analysis_results=None, report_filepath='report.txt'):
+def assignment_score_arrays(assignments):
+    """
+    Collect assignment aggregate scores and team sizes as NumPy arrays.
+    
+    Args:
+        assignments: List of assignment dicts
+        
+    Returns:
+        tuple: (scores, sizes) int64 arrays with one entry per assignment
+    """
+    scores = np.fromiter((a['aggregate_score'] for a in assignments), dtype=np.int64, count=len(assignments))
+    sizes = np.fromiter((a['team_size'] for a in assignments), dtype=np.int64, count=len(assignments))
+    return scores, sizes
+
+
+def generate_report(assignments, unmatched, quality_tracker=None, analysis_results=None, report_filepath='report.txt',
+                    unmatched_count=None):
     """
     Generate a summary report of the team formation results.
     
@@ -1660,182 +2669,168 @@ def generate_report(assignments, unmatched, quality_tracker=None, analysis_resul
         assignments: List of all assignment dicts
         unmatched: List of unmatched subteam dicts
         report_filepath: Path to output report file
+        unmatched_count: Number of people in the unmatched subteams, if
+            already known (computed from `unmatched` otherwise)
     """
     print(f"\n--- Generating Report ---")
     
-    with open(report_filepath, 'w') as f:
-        f.write("=" * 70 + "\n")
-        f.write("TEAM FORMATION SUMMARY REPORT\n")
-        f.write("=" * 70 + "\n\n")
-        
-        # Overall statistics
-        f.write("OVERALL STATISTICS\n")
-        f.write("-" * 70 + "\n")
-        total_teams = len(assignments)
-        total_placed = sum(len(a['team_members']) for a in assignments)
-        unmatched_count = sum(len(team['members']) for team in unmatched)
-        total_students = total_placed + unmatched_count
-        
-        f.write(f"Total students: {total_students}\n")
-        f.write(f"Students successfully placed: {total_placed} ({total_placed/total_students*100:.1f}%)\n")
-        f.write(f"Students unmatched: {unmatched_count} ({unmatched_count/total_students*100:.1f}%)\n")
-        f.write(f"Total teams formed: {total_teams}\n\n")
-        
-        # Preference satisfaction distribution
-        f.write("PREFERENCE SATISFACTION DISTRIBUTION\n")
-        f.write("-" * 70 + "\n")
-        
-        score_ranges = {
-            'Perfect (all #1)': 0,
-            'Excellent (avg 1.0-2.0 per person)': 0,
-            'Good (avg 2.0-3.0 per person)': 0,
-            'Fair (avg 3.0-4.0 per person)': 0,
-            'Poor (avg 4.0+ per person)': 0
-        }
-        
-        teams_with_low_choices = []
-        
-        for assignment in assignments:
-            score = assignment['aggregate_score']
-            team_size = len(assignment['team_members'])
-            avg_per_person = score / team_size
-            max_rank = max(assignment['individual_rankings'])
-            
-            if score == team_size:  # All #1
-                score_ranges['Perfect (all #1)'] += 1
-            elif avg_per_person <= 2.0:
-                score_ranges['Excellent (avg 1.0-2.0 per person)'] += 1
-            elif avg_per_person <= 3.0:
-                score_ranges['Good (avg 2.0-3.0 per person)'] += 1
-            elif avg_per_person <= 4.0:
-                score_ranges['Fair (avg 3.0-4.0 per person)'] += 1
-            else:
-                score_ranges['Poor (avg 4.0+ per person)'] += 1
-            
-            if max_rank >= 4:
-                teams_with_low_choices.append((assignment['project'], max_rank))
-        
-        for range_name, count in score_ranges.items():
-            if count > 0:
-                f.write(f"  {range_name}: {count} team(s)\n")
-        
-        if teams_with_low_choices:
-            f.write(f"\nTeams with members who got #4 or #5 choices: {len(teams_with_low_choices)}\n")
-            for project, max_rank in teams_with_low_choices:
-                f.write(f"  - {project}: highest rank = #{max_rank}\n")
+    # Collect the report text and write it in one call
+    parts = []
+    parts.append(REPORT_RULE)
+    parts.append("TEAM FORMATION SUMMARY REPORT\n")
+    parts.append(REPORT_RULE + "\n")
+    
+    # Overall statistics
+    parts.append("OVERALL STATISTICS\n")
+    parts.append(REPORT_SECTION_RULE)
+    total_teams = len(assignments)
+    scores, sizes = assignment_score_arrays(assignments)
+    total_placed = int(sizes.sum())
+    if unmatched_count is None:
+        unmatched_count = sum(team['size'] for team in unmatched)
+    total_students = total_placed + unmatched_count
+    
+    parts.append(f"Total students: {total_students}\n")
+    parts.append(f"Students successfully placed: {total_placed} ({total_placed/total_students*100:.1f}%)\n")
+    parts.append(f"Students unmatched: {unmatched_count} ({unmatched_count/total_students*100:.1f}%)\n")
+    parts.append(f"Total teams formed: {total_teams}\n\n")
+    
+    # Preference satisfaction distribution
+    parts.append("PREFERENCE SATISFACTION DISTRIBUTION\n")
+    parts.append(REPORT_SECTION_RULE)
+    
+    # Bucket index per team, matching REPORT_SCORE_RANGES: all #1 (0), then
+    # average per person <= 2, <= 3, <= 4 and above 4 (1-4)
+    buckets = np.digitize(scores / np.maximum(sizes, 1), [2.0, 3.0, 4.0], right=True) + 1
+    buckets[scores == sizes] = 0
+    score_range_counts = np.bincount(buckets, minlength=len(REPORT_SCORE_RANGES))
+    
+    # A #4 or worse is only possible 3+ points above an all-#1 score
+    teams_with_low_choices = []
+    for idx in np.flatnonzero(scores - sizes >= 3):
+        max_rank = max(assignments[idx]['individual_rankings'])
+        if max_rank >= 4:
+            teams_with_low_choices.append((assignments[idx]['project'], max_rank))
+    
+    parts.extend(f"  {REPORT_SCORE_RANGES[bucket]}: {score_range_counts[bucket]} team(s)\n"
+                 for bucket in np.flatnonzero(score_range_counts))
+    
+    if teams_with_low_choices:
+        parts.append(f"\nTeams with members who got #4 or #5 choices: {len(teams_with_low_choices)}\n")
+        for project, max_rank in teams_with_low_choices:
+            parts.append(f"  - {project}: highest rank = #{max_rank}\n")
+    
+    parts.append("\n")
+    
+    # Assignment analysis (if provided)
+    if analysis_results:
+        parts.append("ASSIGNMENT OPTIMIZATION ANALYSIS\n")
+        parts.append(REPORT_SECTION_RULE)
         
-        f.write("\n")
+        # Individual preference satisfaction
+        parts.append("Individual Preference Satisfaction:\n")
+        total = analysis_results['total_people']
+        parts.extend(f"  #{rank} choice: {count} people ({(count / total * 100) if total > 0 else 0:.1f}%)\n"
+                     for rank, count in sorted(analysis_results['preference_counts'].items()))
         
-        # Assignment analysis (if provided)
-        if analysis_results:
-            f.write("ASSIGNMENT OPTIMIZATION ANALYSIS\n")
-            f.write("-" * 70 + "\n")
-            
-            # Individual preference satisfaction
-            f.write("Individual Preference Satisfaction:\n")
-            total = analysis_results['total_people']
-            for rank in sorted(analysis_results['preference_counts'].keys()):
-                count = analysis_results['preference_counts'][rank]
-                percentage = (count / total * 100) if total > 0 else 0
-                f.write(f"  #{rank} choice: {count} people ({percentage:.1f}%)\n")
-            
-            f.write(f"\nAverage ranking per person: {analysis_results['average_rank']:.2f}\n")
-            f.write(f"Total aggregate score: {analysis_results['total_aggregate']}\n")
-            
-            # Worst assignments
-            if analysis_results['worst_assignments']:
-                f.write(f"\nAssignments Needing Attention ({len(analysis_results['worst_assignments'])} team(s)):\n")
-                for wa in analysis_results['worst_assignments'][:5]:
-                    f.write(f"  - {wa['project']}: ")
-                    f.write(f"max rank #{wa['max_rank']}, avg {wa['avg_rank']:.2f}, ")
-                    f.write(f"rankings {wa['rankings']}\n")
-            
-            # Optimality verification
-            f.write(f"\nOptimality Status:\n")
-            if analysis_results['improvements_possible']:
-                f.write(f"  ⚠ {len(analysis_results['improvements_possible'])} potential improvement(s) found\n")
-                for imp in analysis_results['improvements_possible'][:3]:
-                    f.write(f"    - {imp['current']} → {imp['better']} ")
-                    f.write(f"(score {imp['current_score']} → {imp['better_score']})\n")
-            else:
-                f.write(f"  ✓ All teams assigned to their best possible project\n")
-            
-            f.write("\n")
+        parts.append(f"\nAverage ranking per person: {analysis_results['average_rank']:.2f}\n")
+        parts.append(f"Total aggregate score: {analysis_results['total_aggregate']}\n")
         
-        # Data quality issues (if tracker provided)
-        if quality_tracker and quality_tracker.has_issues():
-            f.write("DATA QUALITY ISSUES\n")
-            f.write("-" * 70 + "\n")
-            
-            total_issues = sum(len(issues) for issues in quality_tracker.issues.values())
-            f.write(f"Total issues found: {total_issues}\n\n")
-            
-            for category, issues in quality_tracker.issues.items():
-                if issues:
-                    category_name = category.replace('_', ' ').title()
-                    f.write(f"{category_name}: {len(issues)} issue(s)\n")
-                    for issue in issues[:5]:  # Show first 5
-                        f.write(f"  - {issue}\n")
-                    if len(issues) > 5:
-                        f.write(f"  ... and {len(issues) - 5} more\n")
-                    f.write("\n")
-            
-            f.write("Note: These issues were handled automatically where possible.\n")
-            f.write("Unknown netIDs may indicate students not in the dataset.\n\n")
+        # Worst assignments
+        worst_assignments = analysis_results['worst_assignments']
+        if worst_assignments:
+            parts.append(f"\nAssignments Needing Attention ({len(worst_assignments)} team(s)):\n")
+            parts.extend(f"  - {wa['project']}: max rank #{wa['max_rank']}, avg {wa['avg_rank']:.2f}, "
+                         f"rankings {wa['rankings']}\n"
+                         for wa in worst_assignments[:5])
         
-        # Team assignments
-        f.write("TEAM ASSIGNMENTS\n")
-        f.write("-" * 70 + "\n")
+        # Optimality verification
+        parts.append(f"\nOptimality Status:\n")
+        parts.append(f"  ✓ All teams assigned to their best possible project\n")
         
-        # Sort by project name
-        sorted_assignments = sorted(assignments, key=lambda x: x['project'])
+        parts.append("\n")
+    
+    # Data quality issues (if tracker provided)
+    if quality_tracker and quality_tracker.has_issues():
+        parts.append("DATA QUALITY ISSUES\n")
+        parts.append(REPORT_SECTION_RULE)
         
-        for i, assignment in enumerate(sorted_assignments, 1):
-            f.write(f"\nTeam {i}: {assignment['project']}\n")
-            f.write(f"  Members ({len(assignment['team_members'])}): {', '.join(assignment['team_members'])}\n")
-            f.write(f"  Aggregate score: {assignment['aggregate_score']}\n")
-            f.write(f"  Individual rankings: {assignment['individual_rankings']}\n")
-            
-            # Calculate average
-            avg = assignment['aggregate_score'] / len(assignment['team_members'])
-            f.write(f"  Average per person: {avg:.2f}\n")
-        
-        # Unmatched people
-        if unmatched:
-            f.write("\n" + "=" * 70 + "\n")
-            f.write("UNMATCHED STUDENTS\n")
-            f.write("=" * 70 + "\n")
-            f.write(f"Total unmatched: {unmatched_count} student(s)\n\n")
-            
-            # Extract all unmatched netids
-            unmatched_people = []
-            for team in unmatched:
-                unmatched_people.extend(sorted(team['members']))
-            unmatched_people.sort()
-            
-            f.write("List of unmatched students:\n")
-            for i, netid in enumerate(unmatched_people, 1):
-                f.write(f"  {i}. {netid}\n")
-            
-            f.write("\nNote: These students could not be placed in teams of 5-6 with\n")
-            f.write("compatible project preferences (projects in everyone's top 5).\n")
+        total_issues = sum(map(len, quality_tracker.issues.values()))
+        parts.append(f"Total issues found: {total_issues}\n\n")
         
-        f.write("\n" + "=" * 70 + "\n")
-        f.write("END OF REPORT\n")
-        f.write("=" * 70 + "\n")
+        for category, issues in quality_tracker.issues.items():
+            if issues:
+                category_name = quality_tracker.category_names[category]
+                parts.append(f"{category_name}: {len(issues)} issue(s)\n")
+                for issue in quality_tracker.format_issues(category, 5):  # Show first 5
+                    parts.append(f"  - {issue}\n")
+                if len(issues) > 5:
+                    parts.append(f"  ... and {len(issues) - 5} more\n")
+                parts.append("\n")
+        
+        parts.append("Note: These issues were handled automatically where possible.\n")
+        parts.append("Unknown netIDs may indicate students not in the dataset.\n\n")
+    
+    # Team assignments
+    parts.append("TEAM ASSIGNMENTS\n")
+    parts.append(REPORT_SECTION_RULE)
+    
+    # Sort by project name
+    sorted_assignments = sorted(assignments, key=itemgetter('project'))
+    
+    # Pull every field the team entry needs in one call per assignment
+    team_fields = itemgetter('project', 'team_size', 'team_members', 'aggregate_score',
+                             'individual_rankings', 'avg_per_person')
+    for i, assignment in enumerate(sorted_assignments, 1):
+        project, team_size, team_members, aggregate_score, rankings, avg_per_person = team_fields(assignment)
+        parts.append(f"\nTeam {i}: {project}\n"
+                     f"  Members ({team_size}): {', '.join(team_members)}\n"
+                     f"  Aggregate score: {aggregate_score}\n"
+                     f"  Individual rankings: {rankings}\n"
+                     f"  Average per person: {avg_per_person:.2f}\n")
+    
+    # Unmatched people
+    if unmatched:
+        parts.append("\n" + REPORT_RULE)
+        parts.append("UNMATCHED STUDENTS\n")
+        parts.append(REPORT_RULE)
+        parts.append(f"Total unmatched: {unmatched_count} student(s)\n\n")
+        
+        # Extract all unmatched netids
+        unmatched_people = sorted(itertools.chain.from_iterable(team['members'] for team in unmatched))
+        
+        parts.append("List of unmatched students:\n")
+        for i, netid in enumerate(unmatched_people, 1):
+            parts.append(f"  {i}. {netid}\n")
+        
+        parts.append("\nNote: These students could not be placed in teams of 5-6 with\n")
+        parts.append("compatible project preferences (projects in everyone's top 5).\n")
+    
+    parts.append("\n" + REPORT_RULE)
+    parts.append("END OF REPORT\n")
+    parts.append(REPORT_RULE)
+    
+    # Encode the whole report once and hand it to the OS as a single binary
+    # write, skipping the text layer's incremental encoding and buffering
+    with open(report_filepath, 'wb') as f:
+        f.write(''.join(parts).encode('utf-8'))
     
     print(f"Report written to: {report_filepath}")
     print(f"  Total teams: {total_teams}")
     print(f"  People placed: {total_placed}/{total_students}")
 
 
-def main(input_file, output_file):
+def main(input_file, output_file, fuzzy_metric='ratio', verbose=False, cache_dir=None):
     """
     Main function for team formation.
     
     Args:
         input_file (str): Path to the input CSV file with student preferences
         output_file (str): Path to write the output CSV file with team assignments
+        fuzzy_metric (str): Similarity metric for fuzzy netID matching
+        verbose (bool): If True, also print sample preferences, subteams and
+            merged teams
+        cache_dir (str): Optional directory for cached CSV parse results
     """
     try:
         # Initialize data quality tracker
@@ -1845,53 +2840,65 @@ def main(input_file, output_file):
         if not os.path.exists(input_file):
             raise FileNotFoundError(f"Input file not found: {input_file}")
         
-        logging.info(f"Reading preferences from: {input_file}")
+        logging.info("Reading preferences from: %s", input_file)
         
         # Parse the CSV file and load student preferences
-        df = parse_input_csv(input_file)
+        df = parse_input_csv(input_file, cache_dir)
         
         # Extract basic data (netIDs for now)
         basic_data = extract_basic_data(df)
         
+        # Classify project / team member columns once for all extractors
+        columns = classify_columns(df)
+        
         # Extract project preferences
-        project_prefs = extract_project_preferences(df)
+        project_prefs = extract_project_preferences(df, columns, basic_data['netids'])
         
         # Validate input data
         validate_input_data(df, basic_data['netids'], project_prefs, quality_tracker)
         
+        # Dense rank matrix for vectorized team preference calculations
+        rank_matrix = build_rank_matrix(project_prefs)
+        
+        # Per-student project bitmasks for compatibility checks while merging
+        project_masks = build_project_masks(project_prefs)
+        
         # Extract subteam data with cleaning
-        known_netids = set(basic_data['netids'])
-        subteam_data = extract_subteam_data(df, known_netids, quality_tracker)
+        known_netids = frozenset(basic_data['netids'])
+        subteam_data = extract_subteam_data(df, known_netids, quality_tracker, columns, fuzzy_metric,
+                                            basic_data['netids'])
         
         # Identify valid, complete subteams
         subteam_results = identify_subteams(subteam_data)
         
         # Calculate common project preferences for each subteam
         print(f"\n--- Analyzing Subteam Project Preferences ---")
-        subteam_project_analysis = []
+        debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
         subteams_with_no_common = []
         
         for i, subteam in enumerate(subteam_results['complete_subteams']):
-            common_prefs = calculate_subteam_project_prefs(subteam, project_prefs)
-            subteam_project_analysis.append({
-                'subteam': subteam,
-                'common_prefs': common_prefs
-            })
+            # The scored, sorted project list is only needed for the DEBUG
+            # listing; otherwise a bitmask AND answers whether one exists
+            if debug_enabled:
+                common_prefs = calculate_subteam_project_prefs(subteam, project_prefs, rank_matrix)
+                has_common = bool(common_prefs)
+            else:
+                has_common = members_mask(subteam, project_masks) != 0
             
-            if not common_prefs:
-                subteams_with_no_common.append((i+1, sorted(subteam)))
-                logging.error(f"\n⚠️  ERROR: Subteam {i+1} has NO common project preferences!")
-                logging.error(f"   Members: {', '.join(sorted(subteam))}")
+            if not has_common:
+                members_sorted = sorted(subteam)
+                subteams_with_no_common.append((i+1, members_sorted))
+                logging.error("\n⚠️  ERROR: Subteam %s has NO common project preferences!", i+1)
+                logging.error("   Members: %s", ', '.join(members_sorted))
                 quality_tracker.add_issue('no_common_preferences', 
-                                         f"Subteam {i+1}: {', '.join(sorted(subteam))}")
-            else:
-                print(f"\nSubteam {i+1} ({len(subteam)} members) - Top 3 common projects:")
-                for j, (project, data) in enumerate(list(common_prefs.items())[:3]):
-                    print(f"  {j+1}. {project}")
-                    print(f"     Aggregate score: {data['aggregate_score']}")
-                    print(f"     Individual rankings: {data['rankings']}")
+                                         "Subteam %d: %s", i + 1, ', '.join(members_sorted))
+            elif debug_enabled:
+                logging.debug("\nSubteam %d (%d members) - Top 3 common projects:", i + 1, len(subteam))
+                for j, (project, data) in enumerate(itertools.islice(common_prefs.items(), 3)):
+                    logging.debug("  %d. %s\n     Aggregate score: %s\n     Individual rankings: %s",
+                                  j + 1, project, data['aggregate_score'], data['rankings'])
                 if len(common_prefs) > 3:
-                    print(f"  ... and {len(common_prefs) - 3} more common project(s)")
+                    logging.debug("  ... and %d more common project(s)", len(common_prefs) - 3)
         
         # Summary of subteam analysis
         if subteams_with_no_common:
@@ -1901,199 +2908,205 @@ def main(input_file, output_file):
             print(f"\n✓ All {len(subteam_results['complete_subteams'])} subteams have at least one common project preference")
         
         # Classify subteams for team formation
-        classified_teams = classify_subteams(subteam_results)
-        
-        # Assertion: Verify all complete teams are size 5-6
-        for team in classified_teams['complete_teams']:
-            assert len(team['members']) in [5, 6], f"Invalid complete team size: {len(team['members'])}"
+        classified_teams = classify_subteams(subteam_results, project_masks)
         
         # Merge incomplete subteams into valid teams
         merged_results = merge_subteams_into_teams(classified_teams['incomplete_subteams'], project_prefs)
         
-        # Assertion: Verify all merged teams are size 5-6
-        for team in merged_results['formed_teams']:
-            assert len(team['members']) in [5, 6], f"Invalid merged team size: {len(team['members'])}"
-        
         # Assign projects to complete subteams
-        complete_assignments = assign_projects_to_complete_subteams(classified_teams['complete_teams'], project_prefs)
-        
-        # Assertion: Verify all assignments have valid projects
-        for assignment in complete_assignments['assignments']:
-            assert 'project' in assignment, "Assignment missing project"
-            assert 'team_members' in assignment, "Assignment missing team members"
-            assert len(assignment['team_members']) in [5, 6], f"Invalid team size in assignment: {len(assignment['team_members'])}"
-            
-            # Verify project is in everyone's top 5
-            for member in assignment['team_members']:
-                member_prefs = project_prefs.get(member, {})
-                assert assignment['project'] in member_prefs, \
-                    f"Project {assignment['project']} not in {member}'s preferences"
+        complete_assignments = assign_projects_to_complete_subteams(classified_teams['complete_teams'], project_prefs, rank_matrix)
         
         # Assign projects to merged teams
-        merged_assignments = assign_projects_to_merged_teams(merged_results['formed_teams'], project_prefs)
-        
-        # Assertion: Verify merged assignments
-        for assignment in merged_assignments['assignments']:
-            assert len(assignment['team_members']) in [5, 6], f"Invalid merged team size: {len(assignment['team_members'])}"
-            for member in assignment['team_members']:
-                member_prefs = project_prefs.get(member, {})
-                assert assignment['project'] in member_prefs, \
-                    f"Project {assignment['project']} not in {member}'s preferences (merged team)"
-        
-        # Compare complete vs merged team satisfaction
-        print(f"\n--- Satisfaction Comparison: Complete vs Merged Teams ---")
+        merged_assignments = assign_projects_to_merged_teams(merged_results['formed_teams'], project_prefs, rank_matrix)
+        
+        # Assertions: Verify all formed teams are size 5-6 and every assigned
+        # project is in each member's top 5 (skipped under python -O)
+        if __debug__:
+            for team in itertools.chain(classified_teams['complete_teams'], merged_results['formed_teams']):
+                assert team['size'] in (5, 6), f"Invalid team size: {team['size']}"
+            for assignment in itertools.chain(complete_assignments['assignments'], merged_assignments['assignments']):
+                assert 'project' in assignment, "Assignment missing project"
+                assert 'team_members' in assignment, "Assignment missing team members"
+                assert assignment['team_size'] in (5, 6), f"Invalid team size in assignment: {assignment['team_size']}"
+                project = assignment['project']
+                missing = [member for member in assignment['team_members']
+                           if project not in project_prefs.get(member, {})]
+                assert not missing, f"Project {project} not in preferences of: {', '.join(missing)}"
+        
+        # Compare complete vs merged team satisfaction (each console section
+        # below is collected into lines and printed as one write)
+        lines = ["\n--- Satisfaction Comparison: Complete vs Merged Teams ---"]
         
         if complete_assignments['assignments']:
-            complete_scores = [a['aggregate_score'] for a in complete_assignments['assignments']]
-            avg_complete = sum(complete_scores) / len(complete_scores)
-            complete_avg_per_person = avg_complete / len(complete_assignments['assignments'][0]['team_members']) if complete_assignments['assignments'] else 0
-            print(f"\nComplete Subteams:")
-            print(f"  Teams: {len(complete_assignments['assignments'])}")
-            print(f"  Average aggregate score: {avg_complete:.1f}")
-            print(f"  Average score per person: {complete_avg_per_person:.2f}")
-            
-            complete_perfect = sum(1 for a in complete_assignments['assignments'] if a['aggregate_score'] == len(a['team_members']))
-            print(f"  Perfect assignments (all #1): {complete_perfect}/{len(complete_assignments['assignments'])}")
+            complete_scores, complete_sizes = assignment_score_arrays(complete_assignments['assignments'])
+            avg_complete = int(complete_scores.sum()) / len(complete_scores)
+            complete_avg_per_person = avg_complete / int(complete_sizes[0])
+            complete_perfect = int((complete_scores == complete_sizes).sum())
+            lines += [
+                "\nComplete Subteams:",
+                f"  Teams: {len(complete_assignments['assignments'])}",
+                f"  Average aggregate score: {avg_complete:.1f}",
+                f"  Average score per person: {complete_avg_per_person:.2f}",
+                f"  Perfect assignments (all #1): {complete_perfect}/{len(complete_assignments['assignments'])}",
+            ]
         
         if merged_assignments['assignments']:
-            merged_scores = [a['aggregate_score'] for a in merged_assignments['assignments']]
-            avg_merged = sum(merged_scores) / len(merged_scores)
-            avg_team_size = sum(len(a['team_members']) for a in merged_assignments['assignments']) / len(merged_assignments['assignments'])
+            merged_scores, merged_sizes = assignment_score_arrays(merged_assignments['assignments'])
+            avg_merged = int(merged_scores.sum()) / len(merged_scores)
+            avg_team_size = int(merged_sizes.sum()) / len(merged_sizes)
             merged_avg_per_person = avg_merged / avg_team_size
-            print(f"\nMerged Teams:")
-            print(f"  Teams: {len(merged_assignments['assignments'])}")
-            print(f"  Average aggregate score: {avg_merged:.1f}")
-            print(f"  Average score per person: {merged_avg_per_person:.2f}")
-            
-            merged_perfect = sum(1 for a in merged_assignments['assignments'] if a['aggregate_score'] == len(a['team_members']))
-            print(f"  Perfect assignments (all #1): {merged_perfect}/{len(merged_assignments['assignments'])}")
+            merged_perfect = int((merged_scores == merged_sizes).sum())
+            lines += [
+                "\nMerged Teams:",
+                f"  Teams: {len(merged_assignments['assignments'])}",
+                f"  Average aggregate score: {avg_merged:.1f}",
+                f"  Average score per person: {merged_avg_per_person:.2f}",
+                f"  Perfect assignments (all #1): {merged_perfect}/{len(merged_assignments['assignments'])}",
+            ]
         
         # Overall comparison
         if complete_assignments['assignments'] and merged_assignments['assignments']:
-            print(f"\nComparison:")
+            lines.append("\nComparison:")
             if complete_avg_per_person < merged_avg_per_person:
-                print(f"  Complete subteams have better satisfaction (lower score per person)")
+                lines.append("  Complete subteams have better satisfaction (lower score per person)")
             elif complete_avg_per_person > merged_avg_per_person:
-                print(f"  Merged teams have better satisfaction (lower score per person)")
+                lines.append("  Merged teams have better satisfaction (lower score per person)")
             else:
-                print(f"  Both have equal satisfaction")
-        
-        # Print examples of merged teams
-        print(f"\n--- Merged Teams Examples ---")
-        if merged_results['formed_teams']:
-            print(f"\nShowing first 3 merged teams:")
-            for i, team in enumerate(merged_results['formed_teams'][:3]):
-                members_list = sorted(team['members'])
-                print(f"\nMerged Team {i+1} (size {team['size']}):")
-                print(f"  Members: {', '.join(members_list)}")
-                print(f"  Source subteams: {len(team['source_subteams'])} subteam(s) merged")
+                lines.append("  Both have equal satisfaction")
+        print("\n".join(lines))
+        
+        # Print examples of merged teams (diagnostic only)
+        if verbose:
+            lines = ["\n--- Merged Teams Examples ---"]
+            if merged_results['formed_teams']:
+                lines.append("\nShowing first 3 merged teams:")
+                for i, team in enumerate(merged_results['formed_teams'][:3]):
+                    lines += [
+                        f"\nMerged Team {i+1} (size {team['size']}):",
+                        f"  Members: {', '.join(team['members'])}",
+                        f"  Source subteams: {len(team['source_subteams'])} subteam(s) merged",
+                    ]
                 
-                # Show common projects for this merged team
-                common_prefs = calculate_team_project_prefs(team['members'], project_prefs)
-                if common_prefs:
-                    top_projects = list(common_prefs.items())[:3]
-                    print(f"  Common projects:")
-                    for project, data in top_projects:
-                        print(f"    - {project} (score: {data['aggregate_score']})")
-                else:
-                    print(f"  ⚠️  WARNING: No common projects!")
+                    # Show common projects for this merged team
+                    top_projects = calculate_team_project_prefs(team['members'], project_prefs, rank_matrix, top_k=3)
+                    if top_projects:
+                        lines.append("  Common projects:")
+                        lines.extend(f"    - {project} (score: {data['aggregate_score']})"
+                                     for project, data in top_projects.items())
+                    else:
+                        lines.append("  ⚠️  WARNING: No common projects!")
             
-            if len(merged_results['formed_teams']) > 3:
-                print(f"\n... and {len(merged_results['formed_teams']) - 3} more merged teams")
+                if len(merged_results['formed_teams']) > 3:
+                    lines.append(f"\n... and {len(merged_results['formed_teams']) - 3} more merged teams")
+            
+            # Projects shared by the most formed teams, counted in one pass
+            # over the teams' shared-project bitmasks (bit i is column i of
+            # the rank matrix)
+            popularity = Counter(
+                bit for team in itertools.chain(classified_teams['complete_teams'], merged_results['formed_teams'])
+                for bit in mask_bits(team['mask']))
+            if popularity:
+                lines.append("\nMost common shared projects across formed teams:")
+                lines.extend(f"  {rank_matrix['projects'][bit]}: common to {count} team(s)"
+                             for bit, count in popularity.most_common(3))
+            print("\n".join(lines))
         
         # Show unmatched people if any
         if merged_results['unmatched']:
-            logging.warning(f"\n⚠️  Unmatched Subteams/Individuals:")
-            logging.warning(f"  Total unmatched: {len(merged_results['unmatched'])}")
-            unmatched_people = []
-            for team in merged_results['unmatched']:
-                unmatched_people.extend(sorted(team['members']))
-            logging.warning(f"  Unmatched people ({len(unmatched_people)}): {', '.join(unmatched_people[:10])}")
+            logging.warning("\n⚠️  Unmatched Subteams/Individuals:")
+            logging.warning("  Total unmatched: %s", len(merged_results['unmatched']))
+            unmatched_people = list(itertools.chain.from_iterable(
+                team['members'] for team in merged_results['unmatched']))
+            logging.warning("  Unmatched people (%s): %s", len(unmatched_people), ', '.join(unmatched_people[:10]))
             if len(unmatched_people) > 10:
-                logging.warning(f"    ... and {len(unmatched_people) - 10} more")
+                logging.warning("    ... and %s more", len(unmatched_people) - 10)
             
             # Log detailed list at DEBUG level
-            logging.debug(f"  Complete list of unmatched: {', '.join(sorted(unmatched_people))}")
-        
-        # Print examples of extracted preferences
-        print(f"\n--- Sample Project Preferences ---")
-        sample_netids = list(project_prefs.keys())[:3]
-        for netid in sample_netids:
-            prefs = project_prefs[netid]
-            print(f"\n{netid}:")
-            if prefs:
-                # Sort by ranking to show in order
-                sorted_prefs = sorted(prefs.items(), key=lambda x: x[1])
-                for project, rank in sorted_prefs:
-                    print(f"  #{rank} - {project}")
-            else:
-                print(f"  No preferences")
-        
-        # Print examples of complete subteams
-        print(f"\n--- Complete Subteams (Mutual Matches) ---")
-        if subteam_results['complete_subteams']:
-            # Show first 3 complete subteams as examples
-            for i, team in enumerate(subteam_results['complete_subteams'][:3]):
-                sorted_team = sorted(team)
-                print(f"\nSubteam {i+1} (size {len(team)}):")
-                for member in sorted_team:
-                    print(f"  - {member}")
+            if debug_enabled:
+                logging.debug("  Complete list of unmatched: %s", ', '.join(sorted(unmatched_people)))
+        
+        # Print examples of extracted preferences, subteams and individuals
+        # (diagnostic only)
+        if verbose:
+            lines = ["\n--- Sample Project Preferences ---"]
+            for netid in itertools.islice(project_prefs, 3):
+                prefs = project_prefs[netid]
+                lines.append(f"\n{netid}:")
+                if prefs:
+                    # Sort by ranking to show in order
+                    sorted_prefs = sorted(prefs.items(), key=itemgetter(1))
+                    lines.extend(f"  #{rank} - {project}" for project, rank in sorted_prefs)
+                else:
+                    lines.append("  No preferences")
+        
+            # Print examples of complete subteams
+            lines.append("\n--- Complete Subteams (Mutual Matches) ---")
+            if subteam_results['complete_subteams']:
+                # Show first 3 complete subteams as examples
+                for i, team in enumerate(subteam_results['complete_subteams'][:3]):
+                    lines.append(f"\nSubteam {i+1} (size {len(team)}):")
+                    lines.extend(f"  - {member}" for member in sorted(team))
             
-            if len(subteam_results['complete_subteams']) > 3:
-                print(f"\n... and {len(subteam_results['complete_subteams']) - 3} more complete subteam(s)")
-        else:
-            print("No complete subteams found")
-        
-        # Print examples of individuals
-        if subteam_results['individuals']:
-            print(f"\n--- Individuals (No Complete Subteam Match) ---")
-            individuals_list = sorted(list(subteam_results['individuals']))
-            print(f"First 10 individuals: {', '.join(individuals_list[:10])}")
-            if len(individuals_list) > 10:
-                print(f"... and {len(individuals_list) - 10} more")
+                if len(subteam_results['complete_subteams']) > 3:
+                    lines.append(f"\n... and {len(subteam_results['complete_subteams']) - 3} more complete subteam(s)")
+            else:
+                lines.append("No complete subteams found")
+        
+            # Print examples of individuals
+            if subteam_results['individuals']:
+                num_individuals = len(subteam_results['individuals'])
+                lines += [
+                    "\n--- Individuals (No Complete Subteam Match) ---",
+                    f"First 10 individuals: {', '.join(heapq.nsmallest(10, subteam_results['individuals']))}",
+                ]
+                if num_individuals > 10:
+                    lines.append(f"... and {num_individuals - 10} more")
+            print("\n".join(lines))
         
         # Print summary of parsed data
-        print(f"\n--- Summary ---")
-        print(f"Total students: {len(basic_data['netids'])}")
-        print(f"Students with preferences: {sum(1 for p in project_prefs.values() if p)}")
-        print(f"Students with subteam preferences: {sum(1 for s in subteam_data.values() if s)}")
-        print(f"Complete subteams identified: {len(subteam_results['complete_subteams'])}")
-        print(f"Individuals (no complete subteam): {len(subteam_results['individuals'])}")
-        print(f"\nTeam Formation Results:")
         all_formed_teams = classified_teams['complete_teams'] + merged_results['formed_teams']
-        print(f"  Total formed teams: {len(all_formed_teams)}")
         total_placed = sum(team['size'] for team in all_formed_teams)
-        print(f"    People successfully placed: {total_placed}")
-        print(f"    - Complete subteams (no merge needed): {len(classified_teams['complete_teams'])} teams")
-        print(f"    - Merged teams: {len(merged_results['formed_teams'])} teams")
-        
-        print(f"\n  Project Assignments:")
-        print(f"    Complete subteams with projects: {len(complete_assignments['assignments'])}")
-        print(f"    Merged teams with projects: {len(merged_assignments['assignments'])}")
-        total_assigned = len(complete_assignments['assignments']) + len(merged_assignments['assignments'])
-        people_assigned = sum(len(a['team_members']) for a in complete_assignments['assignments']) + sum(len(a['team_members']) for a in merged_assignments['assignments'])
-        print(f"    Total teams with project assignments: {total_assigned}")
-        print(f"    Total people with project assignments: {people_assigned}")
+        # Combine all assignments for output
+        all_assignments = [*complete_assignments['assignments'], *merged_assignments['assignments']]
+        total_assigned = len(all_assignments)
+        people_assigned = sum(a['team_size'] for a in all_assignments)
+        lines = [
+            "\n--- Summary ---",
+            f"Total students: {len(basic_data['netids'])}",
+            f"Students with preferences: {sum(map(bool, project_prefs.values()))}",
+            f"Students with subteam preferences: {sum(map(bool, subteam_data.values()))}",
+            f"Complete subteams identified: {len(subteam_results['complete_subteams'])}",
+            f"Individuals (no complete subteam): {len(subteam_results['individuals'])}",
+            "\nTeam Formation Results:",
+            f"  Total formed teams: {len(all_formed_teams)}",
+            f"    People successfully placed: {total_placed}",
+            f"    - Complete subteams (no merge needed): {len(classified_teams['complete_teams'])} teams",
+            f"    - Merged teams: {len(merged_results['formed_teams'])} teams",
+            "\n  Project Assignments:",
+            f"    Complete subteams with projects: {len(complete_assignments['assignments'])}",
+            f"    Merged teams with projects: {len(merged_assignments['assignments'])}",
+            f"    Total teams with project assignments: {total_assigned}",
+            f"    Total people with project assignments: {people_assigned}",
+        ]
         
         if merged_results['unmatched']:
             unmatched_count = len(merged_results['unmatched'])
-            unmatched_people_count = sum(team['size'] for team in merged_results['unmatched'])
-            print(f"\n  Unmatched: {unmatched_count} subteams ({unmatched_people_count} people)")
+            lines.append(f"\n  Unmatched: {unmatched_count} subteams ({merged_results['unmatched_people']} people)")
         else:
-            print(f"\n  Unmatched: 0 (all students placed!)")
-        print(f"\nNetIDs successfully extracted from column D")
-        print(f"Project preferences successfully extracted")
-        print(f"Subteam data successfully extracted")
-        print(f"Subteam validation completed")
-        print(f"Team classification completed")
-        print(f"Team merging completed")
-        print(f"Project assignment completed for all formed teams")
-        
-        # Combine all assignments for output
-        all_assignments = complete_assignments['assignments'] + merged_assignments['assignments']
+            lines.append("\n  Unmatched: 0 (all students placed!)")
+        lines += [
+            "\nNetIDs successfully extracted from column D",
+            "Project preferences successfully extracted",
+            "Subteam data successfully extracted",
+            "Subteam validation completed",
+            "Team classification completed",
+            "Team merging completed",
+            "Project assignment completed for all formed teams",
+        ]
+        print("\n".join(lines))
         
         # Analyze assignments for optimization and satisfaction
-        analysis_results = analyze_assignments(all_assignments, project_prefs)
+        analysis_results = analyze_assignments(all_assignments)
         
         # Write output CSV
         write_output_csv(all_assignments, output_file)
@@ -2102,45 +3115,49 @@ def main(input_file, output_file):
         validation_passed = validate_output(output_file)
         
         # Generate report with quality tracker data and analysis
-        generate_report(all_assignments, merged_results['unmatched'], quality_tracker, analysis_results)
+        generate_report(all_assignments, merged_results['unmatched'], quality_tracker, analysis_results,
+                        unmatched_count=merged_results['unmatched_people'])
         
         # Print data quality summary
         quality_tracker.print_summary()
         
         # Final success message
-        logging.info(f"\n{'='*70}")
+        logging.info("\n%s", RULE)
         if validation_passed:
-            logging.info(f"TEAM FORMATION COMPLETED SUCCESSFULLY")
+            logging.info("TEAM FORMATION COMPLETED SUCCESSFULLY")
         else:
-            logging.warning(f"TEAM FORMATION COMPLETED WITH VALIDATION WARNINGS")
-        logging.info(f"{'='*70}")
-        logging.info(f"\nSummary:")
-        logging.info(f"  ✓ Output CSV: {output_file}")
+            logging.warning("TEAM FORMATION COMPLETED WITH VALIDATION WARNINGS")
+        logging.info("%s", RULE)
+        logging.info("\nSummary:")
+        logging.info("  ✓ Output CSV: %s", output_file)
         if validation_passed:
-            logging.info(f"  ✓ CSV validation: PASSED")
+            logging.info("  ✓ CSV validation: PASSED")
         else:
-            logging.warning(f"  ⚠ CSV validation: FAILED (check messages above)")
-        logging.info(f"  ✓ Report: report.txt")
-        logging.info(f"  ✓ Log file: team_formation.log")
-        logging.info(f"  ✓ Teams formed: {len(all_assignments)}")
-        logging.info(f"  ✓ Students placed: {sum(len(a['team_members']) for a in all_assignments)}/{len(basic_data['netids'])}")
+            logging.warning("  ⚠ CSV validation: FAILED (check messages above)")
+        logging.info("  ✓ Report: report.txt")
+        logging.info("  ✓ Log file: team_formation.log")
+        logging.info("  ✓ Teams formed: %s", total_assigned)
+        logging.info("  ✓ Students placed: %s/%s", people_assigned, len(basic_data['netids']))
         
         if merged_results['unmatched']:
-            unmatched_count = sum(len(team['members']) for team in merged_results['unmatched'])
-            logging.warning(f"  ⚠ Students unmatched: {unmatched_count}")
-            logging.warning(f"     (See report.txt for details)")
+            logging.warning("  ⚠ Students unmatched: %s", merged_results['unmatched_people'])
+            logging.warning("     (See report.txt for details)")
         
-        logging.info(f"\n{'='*70}")
+        logging.info("\n%s", RULE)
         
     except FileNotFoundError as e:
-        logging.error(f"Error: {e}")
+        logging.error("Error: %s", e)
         sys.exit(1)
     except PermissionError as e:
-        logging.error(f"Error: Permission denied - {e}")
+        logging.error("Error: Permission denied - %s", e)
         sys.exit(1)
+    except MemoryError:
+        # Let out-of-memory surface with its traceback rather than as a
+        # one-line "unexpected error"
+        raise
     except Exception as e:
-        logging.error(f"Error: An unexpected error occurred - {e}")
-        logging.debug(f"Exception details:", exc_info=True)
+        logging.error("Error: An unexpected error occurred - %s", e)
+        logging.debug("Exception details:", exc_info=True)
         sys.exit(1)
 
 
@@ -2195,6 +3212,16 @@ Examples:
         action="store_true",
         help="Skip generating detailed report.txt file"
     )
+    parser.add_argument(
+        "--fuzzy-metric",
+        choices=FUZZY_METRICS,
+        default="ratio",
+        help="Similarity metric for fuzzy netID matching (jaro_winkler requires rapidfuzz; default: ratio)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache the parsed CSV in this directory, keyed on the file's contents, to skip parsing on re-runs"
+    )
     
     args = parser.parse_args()
     
@@ -2207,14 +3234,15 @@ Examples:
     # Setup logging
     setup_logging(verbose=args.verbose)
     
-    logging.info("="*70)
+    logging.info(RULE)
     logging.info("Team Formation System")
-    logging.info("="*70)
-    logging.info(f"Input file: {input_file}")
-    logging.info(f"Output file: {output_file}")
-    logging.info(f"Verbose mode: {args.verbose}")
-    logging.info(f"Generate report: {not args.no_report}")
-    logging.info("="*70 + "\n")
+    logging.info(RULE)
+    logging.info("Input file: %s", input_file)
+    logging.info("Output file: %s", output_file)
+    logging.info("Verbose mode: %s", args.verbose)
+    logging.info("Generate report: %s", not args.no_report)
+    logging.info("Fuzzy metric: %s", args.fuzzy_metric)
+    logging.info(RULE + "\n")
     
     # Run tests if requested
     if args.test:
@@ -2226,12 +3254,15 @@ Examples:
     
     # Run main processing
     try:
-        main(input_file, output_file)
+        main(input_file, output_file, args.fuzzy_metric, args.verbose, args.cache_dir)
     except KeyboardInterrupt:
         logging.warning("\n\nProcess interrupted by user")
         sys.exit(130)
+    except MemoryError:
+        logging.error("\nFatal error: out of memory")
+        raise
     except Exception as e:
-        logging.error(f"\nFatal error: {e}")
+        logging.error("\nFatal error: %s", e)
         logging.debug("Full traceback:", exc_info=True)
         sys.exit(1)
 